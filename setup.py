@@ -83,6 +83,7 @@ setup(
         'zope.component>=3.8.0',
         'zope.configuration',
         'zope.container',
+        'zope.datetime',
         'zope.deprecation',
         'zope.hookable',
         'zope.i18n',
@@ -113,6 +114,9 @@ setup(
       entry_points = """
         [console_scripts]
         static-apidoc = zope.app.apidoc.static:main
+        apidoc-export = zope.app.apidoc.export:main
+        apidoc-benchmark = zope.app.apidoc.benchmark:main
+        apidoc-memory = zope.app.apidoc.memory:main
         """,
       zip_safe = False,
       )
@@ -19,7 +19,6 @@ __docformat__ = 'restructuredtext'
 
 import zope.component
 from zope.interface import implements
-from zope.publisher.browser import applySkin
 from zope.location import locate
 from zope.location.interfaces import ILocation
 
@@ -61,6 +60,8 @@ class apidocNamespace(object):
     """Used to traverse to an API Documentation."""
     def __init__(self, ob, request=None):
         if request:
+            # Imported on first use; the browser modules are expensive.
+            from zope.publisher.browser import applySkin
             from zope.app.apidoc.browser.skin import APIDOC
             applySkin(request, APIDOC)
         self.context = ob
@@ -0,0 +1,402 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Benchmarks of the documentation modules
+
+The benchmarks build synthetic registries of configurable size -- a package of
+generated modules and classes, interfaces, adapters, views, utilities and ZCML
+directives -- and time the key operations of the documentation modules. The
+results are written in JSON format, so that runs can be compared to find
+performance regressions.
+
+The static generator is benchmarked end-to-end against the functional test
+configuration, so that its results only depend on this package.
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+import os
+import sys
+import time
+import shutil
+import tempfile
+import optparse
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+import zope.component
+import zope.schema
+from zope.component.interface import provideInterface
+from zope.component.interfaces import IFactory
+from zope.configuration.config import ConfigurationMachine
+from zope.configuration.interfaces import IConfigurationContext
+from zope.interface import Attribute, Interface, implements
+from zope.interface.interface import InterfaceClass
+from zope.publisher.browser import TestRequest
+from zope.publisher.interfaces.browser import IBrowserRequest
+
+from zope.app.apidoc.codemodule.interfaces import IAPIDocRootModule
+
+# The sizes of the synthetic registries.
+DEFAULT_SIZES = {'classes': 50000,
+                 'interfaces': 5000,
+                 'adapters': 100000,
+                 'utilities': 10000,
+                 'directives': 5000}
+
+# The number of generated classes per generated module.
+CLASSES_PER_MODULE = 100
+
+# Every that many adapters is registered as a browser view.
+VIEW_RATIO = 10
+
+# The number of objects some operations are timed for.
+SAMPLE_SIZE = 10
+
+# The name of the generated package.
+PACKAGE = 'apidoc_benchmark'
+
+MODULE_TEMPLATE = '''\
+"""Generated module %(module)i."""
+'''
+
+CLASS_TEMPLATE = '''
+class Class%(module)i_%(index)i(%(base)s):
+    """Generated class %(index)i."""
+
+    attribute = %(index)i
+
+    def method(self, first, second=None):
+        """Generated method."""
+
+    def other(self, *args, **kw):
+        """Another generated method."""
+'''
+
+
+def writePackage(directory, classes, perModule=CLASSES_PER_MODULE):
+    """Write a package of generated modules and classes.
+
+    Return the Python paths of the generated modules.
+    """
+    package = os.path.join(directory, PACKAGE)
+    os.mkdir(package)
+    open(os.path.join(package, '__init__.py'), 'w').close()
+    modules = []
+    for module in range((classes + perModule - 1) // perModule):
+        source = [MODULE_TEMPLATE % {'module': module}]
+        for index in range(min(perModule, classes - module*perModule)):
+            # Every other class extends its predecessor.
+            base = index % 2 and 'Class%i_%i' % (module, index-1) or 'object'
+            source.append(CLASS_TEMPLATE % {'module': module, 'index': index,
+                                            'base': base})
+        file = open(os.path.join(package, 'module%i.py' % module), 'w')
+        try:
+            file.write(''.join(source))
+        finally:
+            file.close()
+        modules.append('%s.module%i' % (PACKAGE, module))
+    return modules
+
+
+def createInterfaces(count):
+    """Create and register interfaces with a few attributes and methods."""
+    interfaces = []
+    for index in range(count):
+        def method(first, second=None):
+            """Generated method."""
+        attrs = {'attribute': Attribute('Generated attribute.'),
+                 'field': zope.schema.TextLine(title=u'Field'),
+                 'method': method}
+        iface = InterfaceClass('IInterface%i' % index, (Interface,), attrs,
+                               'Generated interface %i.' % index, PACKAGE)
+        provideInterface('%s.IInterface%i' % (PACKAGE, index), iface)
+        interfaces.append(iface)
+    return interfaces
+
+
+class Factory(object):
+    """Factory of the generated adapters and utilities."""
+
+    def __init__(self, *args):
+        self.args = args
+
+
+def registerAdapters(interfaces, count):
+    """Register adapters and views between the interfaces."""
+    gsm = zope.component.getGlobalSiteManager()
+    total = len(interfaces)
+    for index in range(count):
+        required = interfaces[index % total]
+        provided = interfaces[(index*7 + 1) % total]
+        if index % VIEW_RATIO:
+            gsm.registerAdapter(Factory, (required,), provided,
+                                'adapter%i' % index)
+        else:
+            gsm.registerAdapter(Factory, (required, IBrowserRequest),
+                                Interface, 'view%i.html' % index)
+
+
+def registerUtilities(interfaces, count):
+    """Register utilities providing the interfaces."""
+    gsm = zope.component.getGlobalSiteManager()
+    total = len(interfaces)
+    for index in range(count):
+        gsm.registerUtility(Factory(index), interfaces[index % total],
+                            'utility%i' % index)
+
+
+class IGeneratedDirective(Interface):
+    """Generated directive."""
+
+    name = zope.schema.TextLine(title=u'Name')
+
+def handler(_context, name):
+    """Handler of the generated directives."""
+
+
+def createConfigContext(count, namespaces=20):
+    """Return a configuration context documenting many directives."""
+    context = ConfigurationMachine()
+    for index in range(count):
+        namespace = 'http://namespaces.example.com/ns%i' % (index % namespaces)
+        context.document((namespace, 'directive%i' % index),
+                         IGeneratedDirective, IConfigurationContext, handler,
+                         'Generated directive %i.' % index)
+    return context
+
+
+class RootModule(str):
+    implements(IAPIDocRootModule)
+
+
+def measure(func, repeat, setup=None):
+    """Call a function several times and return the timings in seconds.
+
+    The first call is reported separately, since it includes the cost of
+    filling the caches.
+    """
+    timings = []
+    for index in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.time()
+        func()
+        timings.append(time.time() - start)
+    return {'first': timings[0],
+            'min': min(timings),
+            'mean': sum(timings) / len(timings),
+            'runs': repeat}
+
+
+def setUp(sizes, directory):
+    """Set up the components and build the synthetic registries.
+
+    Return the API documentation and the paths of the generated modules.
+    """
+    from zope.app.testing import setup, ztapi
+    from zope.app.renderer.rest import ReStructuredTextSourceFactory
+    from zope.app.renderer.rest import IReStructuredTextSource
+    from zope.app.renderer.rest import ReStructuredTextToHTMLRenderer
+    from zope.app.apidoc.apidoc import APIDocumentation
+    from zope.app.apidoc.interfaces import IDocumentationModule
+    from zope.app.apidoc.codemodule.codemodule import CodeModule
+    from zope.app.apidoc.ifacemodule.ifacemodule import InterfaceModule
+    from zope.app.apidoc.utilitymodule.utilitymodule import UtilityModule
+    from zope.app.apidoc.zcmlmodule import ZCMLModule
+
+    rootFolder = setup.placefulSetUp(True)
+    ztapi.provideUtility(IFactory, ReStructuredTextSourceFactory,
+                         'zope.source.rest')
+    ztapi.provideUtility(IFactory, ReStructuredTextSourceFactory,
+                         'zope.source.stx')
+    ztapi.browserView(IReStructuredTextSource, '',
+                      ReStructuredTextToHTMLRenderer)
+
+    modules = writePackage(directory, sizes['classes'])
+    sys.path.insert(0, directory)
+    ztapi.provideUtility(IAPIDocRootModule, RootModule(PACKAGE), PACKAGE)
+
+    interfaces = createInterfaces(sizes['interfaces'])
+    registerAdapters(interfaces, sizes['adapters'])
+    registerUtilities(interfaces, sizes['utilities'])
+
+    ztapi.provideUtility(IDocumentationModule, CodeModule(), 'Code')
+    ztapi.provideUtility(IDocumentationModule, InterfaceModule(), 'Interface')
+    ztapi.provideUtility(IDocumentationModule, UtilityModule(), 'Utility')
+    ztapi.provideUtility(IDocumentationModule, ZCMLModule(), 'ZCML')
+    return APIDocumentation(rootFolder, '++apidoc++'), modules
+
+
+def tearDown(directory):
+    from zope.app.testing import setup
+    setup.placefulTearDown()
+    if directory in sys.path:
+        sys.path.remove(directory)
+    for name in sys.modules.keys():
+        if name == PACKAGE or name.startswith(PACKAGE + '.'):
+            del sys.modules[name]
+    shutil.rmtree(directory)
+
+
+def run(sizes=None, repeat=5):
+    """Run the benchmarks and return the results."""
+    from zope.app.apidoc import zcmlmodule
+    from zope.app.apidoc.codemodule.browser.class_ import ClassDetails
+    from zope.app.apidoc.codemodule.browser.menu import Menu as CodeMenu
+    from zope.app.apidoc.codemodule.codemodule import CodeModule
+    from zope.app.apidoc.ifacemodule.browser import InterfaceDetails
+    from zope.app.apidoc.ifacemodule.menu import Menu as InterfaceMenu
+    import zope.app.appsetup.appsetup
+
+    sizes = dict(DEFAULT_SIZES, **(sizes or {}))
+    directory = tempfile.mkdtemp()
+    results = {}
+    apidoc, modules = setUp(sizes, directory)
+    config_context = zope.app.appsetup.appsetup.__config_context
+    try:
+        def importModules():
+            for path in modules:
+                __import__(path)
+        results['import'] = measure(importModules, 1)
+
+        def setupCode():
+            CodeModule().setup()
+        results['CodeModule.setup'] = measure(setupCode, repeat)
+
+        code = apidoc.get('Code')
+        code.setup()
+        menu = CodeMenu()
+        menu.context = code
+        menu.request = TestRequest(form={'path': 'Class1_1'})
+        results['findClasses'] = measure(menu.findClasses, repeat)
+
+        ifaceModule = apidoc.get('Interface')
+        menu = InterfaceMenu()
+        menu.context = ifaceModule
+        menu.request = TestRequest(form={'search_str': 'IInterface1'})
+        results['findInterfaces'] = measure(menu.findInterfaces, repeat)
+
+        names = ['%s.IInterface%i' % (PACKAGE, index)
+                 for index in range(min(SAMPLE_SIZE, sizes['interfaces']))]
+        def createInterfaceDetails():
+            for name in names:
+                InterfaceDetails(ifaceModule.get(name), TestRequest())
+        results['InterfaceDetails'] = measure(createInterfaceDetails, repeat)
+
+        classes = [code[PACKAGE]['module0']['Class0_%i' % index]
+                   for index in range(min(SAMPLE_SIZE, sizes['classes']))]
+        def getMethods():
+            for klass in classes:
+                details = ClassDetails()
+                details.context = klass
+                details.request = TestRequest()
+                details.getMethods()
+        results['ClassDetails.getMethods'] = measure(getMethods, repeat)
+
+        results['UtilityModule.items'] = measure(
+            apidoc.get('Utility').items, repeat)
+
+        zope.app.appsetup.appsetup.__config_context = createConfigContext(
+            sizes['directives'])
+        results['ZCMLModule.items'] = measure(
+            apidoc.get('ZCML').items, repeat, zcmlmodule._clear)
+    finally:
+        zope.app.appsetup.appsetup.__config_context = config_context
+        tearDown(directory)
+
+    return {'sizes': sizes,
+            'repeat': repeat,
+            'python': sys.version.split()[0],
+            'platform': sys.platform,
+            'results': results}
+
+
+def runStatic(args=()):
+    """Generate the static documentation and return its statistics.
+
+    The documentation is retrieved with the publisher from the functional
+    test configuration and written into a temporary directory. `args` are
+    further options of the static generator.
+    """
+    from zope.app.apidoc import static
+
+    directory = tempfile.mkdtemp()
+    try:
+        options = static.get_options(
+            ['apidoc-benchmark', '--publisher', '--verbosity', '1']
+            + list(args) + [os.path.join(directory, 'apidoc')])
+        options.progress = False
+        generator = static.StaticAPIDocGenerator(options)
+        generator.start()
+        return generator.getStatistics()
+    finally:
+        shutil.rmtree(directory)
+
+
+###############################################################################
+# Command-line UI
+
+parser = optparse.OptionParser("%prog [options]")
+
+for name, size in sorted(DEFAULT_SIZES.items()):
+    parser.add_option(
+        '--' + name, action="store", type="int", dest=name, default=size,
+        help="The number of generated %s (default: %i)." % (name, size))
+
+parser.add_option(
+    '--repeat', '-r', action="store", type="int", dest='repeat', default=5,
+    help="How often every operation is timed (default: 5).")
+
+parser.add_option(
+    '--static', action="store_true", dest='static', default=False,
+    help="""\
+Benchmark the generation of the static documentation instead of the
+documentation modules.
+""")
+
+parser.add_option(
+    '--output', '-o', action="store", dest='output',
+    help="""\
+The file the JSON results are written to; by default they are written to the
+standard output.
+""")
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    options, positional = parser.parse_args(args)
+    if options.static:
+        results = {'python': sys.version.split()[0],
+                   'platform': sys.platform,
+                   'static': runStatic()}
+    else:
+        sizes = dict([(name, getattr(options, name))
+                      for name in DEFAULT_SIZES])
+        results = run(sizes, options.repeat)
+
+    output = sys.stdout
+    if options.output:
+        output = open(options.output, 'w')
+    try:
+        json.dump(results, output, indent=2, sort_keys=True)
+        output.write('\n')
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == '__main__':
+    main()
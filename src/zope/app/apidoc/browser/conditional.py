@@ -0,0 +1,171 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Conditional Requests for Documentation Pages
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+import os
+import sys
+import time
+
+try:
+    from hashlib import md5
+except ImportError:
+    from md5 import new as md5
+
+from zope.datetime import rfc1123_date
+from zope.datetime import time as timeFromDateTimeString
+from zope.i18n.interfaces import IUserPreferredLanguages
+from zope.interface import directlyProvidedBy
+from zope.proxy import removeAllProxies
+
+from zope.app.apidoc import generation
+from zope.app.apidoc.codemodule.interfaces import IModuleDocumentation
+from zope.app.apidoc.codemodule.interfaces import IZCMLFile, ITextFile
+from zope.app.apidoc.utilitymodule.utilitymodule import Utility
+from zope.app.apidoc.zcmlmodule import Directive
+
+# Pages are different in every process, since the generations start again.
+_started = time.time()
+
+
+def getSourceFileName(obj):
+    """Return the name of the source file of a documented object.
+
+    `None` is returned, if the object has no known source file.
+    """
+    obj = removeAllProxies(obj)
+    if IZCMLFile.providedBy(obj):
+        return obj.filename
+    if ITextFile.providedBy(obj):
+        return obj.path
+
+    node = obj
+    while node is not None:
+        if IModuleDocumentation.providedBy(node):
+            filename = node.getFileName()
+            break
+        node = removeAllProxies(getattr(node, '__parent__', None))
+    else:
+        # For example interfaces, which are documented without modules. The
+        # pages of directives and utilities document their handlers and
+        # components.
+        if isinstance(obj, Directive):
+            obj = obj.handler
+        elif isinstance(obj, Utility):
+            obj = removeAllProxies(obj.component)
+        module = sys.modules.get(getattr(obj, '__module__', None))
+        filename = getattr(module, '__file__', None)
+
+    if filename and filename[-4:] in ('.pyc', '.pyo') and \
+           os.path.exists(filename[:-1]):
+        filename = filename[:-1]
+    return filename
+
+
+def getModificationTime(filename):
+    """Return the modification time of a file or `None`."""
+    if not filename:
+        return None
+    try:
+        return os.stat(filename).st_mtime
+    except OSError:
+        # For example files in zipped eggs
+        return None
+
+
+class ConditionalView(object):
+    """Mixin for pages that answer conditional requests.
+
+    The validators of a page are derived from the generations of the
+    documented registries and the modification time of the documented
+    object's source file. If the client's copy of the page is still valid, the
+    page is not rendered at all, but a ``304 Not Modified`` response is
+    returned.
+    """
+
+    def getCacheKey(self):
+        """Return further data the page depends on.
+
+        Pages that depend on preferences, for example, should add them here.
+        """
+        return None
+
+    def getLastModified(self):
+        """Return the time of the last modification of the page."""
+        times = [getModificationTime(getSourceFileName(self.context)),
+                 generation.getLastModified(), _started]
+        return max([t for t in times if t is not None])
+
+    def getLanguages(self):
+        """Return the preferred languages of the request.
+
+        The language the page is translated to is negotiated from them.
+        """
+        languages = IUserPreferredLanguages(self.request, None)
+        if languages is None:
+            return None
+        return tuple(languages.getPreferredLanguages())
+
+    def getSkin(self):
+        """Return the dotted names of the skin and layers of the request."""
+        return tuple([iface.__identifier__ for iface in
+                      directlyProvidedBy(removeAllProxies(self.request))])
+
+    def getETag(self):
+        """Return the entity tag of the page."""
+        principal = getattr(self.request, 'principal', None)
+        data = (_started,
+                generation.getGeneration(generation.COMPONENTS),
+                generation.getGeneration(generation.CLASSES),
+                generation.getGeneration(generation.CODE),
+                getModificationTime(getSourceFileName(self.context)),
+                getattr(principal, 'id', None),
+                self.getLanguages(),
+                self.getSkin(),
+                self.getCacheKey())
+        return '"%s"' % md5(repr(data)).hexdigest()
+
+    def isNotModified(self, etag, lastModified):
+        """Check the validators of the request against the page."""
+        header = self.request.getHeader('If-None-Match')
+        if header:
+            # The entity tag has precedence over the modification date.
+            tags = [tag.strip() for tag in header.split(',')]
+            return etag in tags or '*' in tags
+        header = self.request.getHeader('If-Modified-Since')
+        if header:
+            try:
+                since = timeFromDateTimeString(header.split(';')[0])
+            except Exception:
+                return False
+            return int(lastModified) <= since
+        return False
+
+    def __call__(self, *args, **kw):
+        if self.request.method not in ('GET', 'HEAD'):
+            return self.index(*args, **kw)
+        etag = self.getETag()
+        lastModified = self.getLastModified()
+        response = self.request.response
+        response.setHeader('ETag', etag)
+        response.setHeader('Last-Modified', rfc1123_date(lastModified))
+        response.setHeader('Cache-Control', 'private, no-cache')
+        # The page is translated to the language of the request.
+        response.setHeader('Vary', 'Accept-Language')
+        if self.isNotModified(etag, lastModified):
+            response.setStatus(304)
+            return ''
+        return self.index(*args, **kw)
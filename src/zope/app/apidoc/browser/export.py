@@ -0,0 +1,115 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Export Views
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+import tempfile
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from zope.publisher.http import DirectResult
+from zope.security.proxy import removeSecurityProxy
+
+from zope.app.apidoc.export import export, lookup
+
+
+# The size of the chunks the export is streamed in.
+CHUNK_SIZE = 1 << 16
+
+# The maximum number of paths that are looked up in one request.
+MAX_LOOKUP_PATHS = 1000
+
+
+def getList(request, name):
+    """Return a form value that may be given several times as list."""
+    value = request.form.get(name)
+    if not value:
+        return None
+    if isinstance(value, basestring):
+        return [value]
+    return list(value)
+
+
+def readChunks(file, size=CHUNK_SIZE):
+    """Generate the chunks of a file from the start and close it."""
+    try:
+        file.seek(0)
+        while True:
+            chunk = file.read(size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file.close()
+
+
+class APIDocExport(object):
+    """Stream the documentation as JSON lines.
+
+    The ``module`` and ``root`` form values select the documentation modules
+    and root packages to export. The documentation can only be walked while
+    the request is published, so the lines are written to a temporary file
+    first, which is then streamed.
+    """
+
+    def __call__(self):
+        apidoc = removeSecurityProxy(self.context)
+        file = tempfile.TemporaryFile()
+        try:
+            for line in export(apidoc, getList(self.request, 'module'),
+                               getList(self.request, 'root')):
+                file.write(line)
+        except:
+            file.close()
+            raise
+        response = self.request.response
+        response.setHeader('Content-Type', 'application/x-json-lines')
+        response.setHeader('Content-Length', str(file.tell()))
+        return DirectResult(readChunks(file))
+
+
+class APIDocLookup(object):
+    """Return the records of many objects in one JSON response.
+
+    The dotted paths of the objects are given as ``path`` form values or as
+    a JSON list in the body of a POST request. The response maps every path
+    to its record, or to ``null`` if it cannot be resolved. Entries that are
+    not strings are ignored, and only the first `MAX_LOOKUP_PATHS` paths are
+    looked up.
+    """
+
+    def getPaths(self):
+        paths = getList(self.request, 'path')
+        if paths is None and self.request.method == 'POST':
+            body = self.request.bodyStream.read()
+            if body.strip():
+                try:
+                    paths = json.loads(body)
+                except ValueError:
+                    paths = None
+                if not isinstance(paths, list):
+                    paths = None
+        paths = [path for path in paths or () if isinstance(path, basestring)]
+        return paths[:MAX_LOOKUP_PATHS]
+
+    def __call__(self):
+        apidoc = removeSecurityProxy(self.context)
+        records = lookup(apidoc, self.getPaths())
+        self.request.response.setHeader('Content-Type', 'application/json')
+        return json.dumps(records, default=unicode)
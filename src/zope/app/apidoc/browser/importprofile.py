@@ -0,0 +1,52 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Import Profile Views
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+
+from zope.app.apidoc.importprofile import importProfile, SORT_KEYS
+
+
+class ImportProfileView(object):
+    """Views of the import profile."""
+
+    def getSortKey(self):
+        sort = self.request.get('sort', 'time')
+        if sort not in SORT_KEYS:
+            sort = 'time'
+        return sort
+
+    def isEnabled(self):
+        return importProfile.enabled
+
+    def getRecords(self):
+        """Return the records sorted as requested."""
+        return [{'path': record.path,
+                 'importTime': '%.3f' % record.importTime,
+                 'setupTime': '%.3f' % record.setupTime,
+                 'memory': record.memory is None and 'n/a' or record.memory,
+                 'children': record.children}
+                for record in importProfile.getRecords(self.getSortKey())]
+
+    def json(self):
+        """Return the records in JSON format."""
+        self.request.response.setHeader('Content-Type', 'application/json')
+        return importProfile.toJSON(self.getSortKey())
+
+    def text(self):
+        """Return the records as plain text."""
+        self.request.response.setHeader('Content-Type', 'text/plain')
+        return importProfile.formatText(self.getSortKey())
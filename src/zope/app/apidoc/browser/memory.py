@@ -0,0 +1,49 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Memory Report Views
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from zope.security.proxy import removeSecurityProxy
+
+from zope.app.apidoc.memory import getReport, formatText
+
+
+class MemoryReportView(object):
+    """Views of the memory footprint of the documentation."""
+
+    def getLimit(self):
+        try:
+            return int(self.request.get('limit', 10))
+        except ValueError:
+            return 10
+
+    def json(self):
+        """Return the report in JSON format."""
+        report = getReport(removeSecurityProxy(self.context))
+        self.request.response.setHeader('Content-Type', 'application/json')
+        return json.dumps(report, sort_keys=True)
+
+    def text(self):
+        """Return the report as plain text."""
+        report = getReport(removeSecurityProxy(self.context))
+        self.request.response.setHeader('Content-Type', 'text/plain')
+        return formatText(report, self.getLimit())
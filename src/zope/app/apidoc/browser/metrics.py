@@ -0,0 +1,46 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Metrics Views
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from zope.security.proxy import removeSecurityProxy
+
+from zope.app.apidoc.metrics import getMetrics, formatPrometheus
+
+
+class APIDocMetrics(object):
+    """Return the metrics in the text format of Prometheus."""
+
+    def __call__(self):
+        metrics = getMetrics(removeSecurityProxy(self.context))
+        self.request.response.setHeader('Content-Type',
+                                        'text/plain; version=0.0.4')
+        return formatPrometheus(metrics)
+
+
+class APIDocMetricsJSON(object):
+    """Return the metrics in JSON format."""
+
+    def __call__(self):
+        metrics = getMetrics(removeSecurityProxy(self.context))
+        self.request.response.setHeader('Content-Type', 'application/json')
+        return json.dumps(metrics, sort_keys=True)
@@ -19,6 +19,11 @@ import re
 import unittest
 import doctest
 
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
 import zope.app.testing.functional
 from zope.testing import renormalizing
 from zope.app.testing.functional import BrowserTestCase, FunctionalNoDevMode
@@ -65,6 +70,150 @@ class APIDocTests(BrowserTestCase):
         self.checkForBrokenLinks(body, '/++apidoc++/modulelist.html',
                                  basic='mgr:mgrpw')
 
+    def testImportProfileView(self):
+        response = self.publish('/++apidoc++/importprofile.html',
+                                basic='mgr:mgrpw')
+        self.assertEqual(response.getStatus(), 200)
+        body = response.getBody()
+        self.assert_(body.find('Import Profile') > 0)
+        response = self.publish('/++apidoc++/importprofile.json',
+                                basic='mgr:mgrpw')
+        self.assertEqual(response.getStatus(), 200)
+        self.assertEqual(response.getBody(), '[]')
+
+    def testExportView(self):
+        response = self.publish(
+            '/++apidoc++/export.jsonl?module=ZCML&root=zope.app.apidoc',
+            basic='mgr:mgrpw')
+        self.assertEqual(response.getStatus(), 200)
+        lines = response.getBody().splitlines()
+        self.assert_(lines)
+        for line in lines:
+            record = json.loads(line)
+            self.assertEqual(record['module'], 'ZCML')
+            self.assertEqual(record['type'], 'directive')
+            self.assert_(record['path'].startswith('zope.app.apidoc.'))
+
+    def testConditionalRequests(self):
+        path = '/++apidoc++/Code/zope/app/apidoc/cache/BoundedCache/index.html'
+        # The first request may still register classes, which changes the
+        # validators.
+        self.publish(path, basic='mgr:mgrpw')
+        response = self.publish(path, basic='mgr:mgrpw')
+        self.assertEqual(response.getStatus(), 200)
+        etag = response.getHeader('ETag')
+        lastModified = response.getHeader('Last-Modified')
+        self.assert_(etag)
+        self.assert_(lastModified)
+
+        response = self.publish(path, basic='mgr:mgrpw',
+                                env={'HTTP_IF_NONE_MATCH': etag})
+        self.assertEqual(response.getStatus(), 304)
+        self.assertEqual(response.getBody(), '')
+        response = self.publish(path, basic='mgr:mgrpw',
+                                env={'HTTP_IF_MODIFIED_SINCE': lastModified})
+        self.assertEqual(response.getStatus(), 304)
+
+        response = self.publish(path, basic='mgr:mgrpw',
+                                env={'HTTP_IF_NONE_MATCH': '"outdated"'})
+        self.assertEqual(response.getStatus(), 200)
+
+        # The page is translated to the language of the request.
+        self.assertEqual(response.getHeader('Vary'), 'Accept-Language')
+        response = self.publish(path, basic='mgr:mgrpw',
+                                env={'HTTP_IF_NONE_MATCH': etag,
+                                     'HTTP_ACCEPT_LANGUAGE': 'de'})
+        self.assertEqual(response.getStatus(), 200)
+        self.assertNotEqual(response.getHeader('ETag'), etag)
+
+    def testSourceFileNameOfDirective(self):
+        from zope.app.apidoc.browser.conditional import getSourceFileName
+        from zope.app.apidoc.codemodule import metaconfigure
+        from zope.app.apidoc.zcmlmodule import Directive
+        directive = Directive(None, 'rootModule', None,
+                              metaconfigure.rootModule, None, [])
+        filename = metaconfigure.__file__
+        if filename[-4:] in ('.pyc', '.pyo'):
+            filename = filename[:-1]
+        self.assertEqual(getSourceFileName(directive), filename)
+
+    def testResourceCacheControl(self):
+        response = self.publish('/@@/apidoc.css')
+        self.assertEqual(response.getStatus(), 200)
+        self.assert_(response.getHeader('Cache-Control').startswith('public'))
+
+    def testTimingHeader(self):
+        path = '/++apidoc++/Interface/zope.app.apidoc.interfaces.' \
+               'IDocumentationModule/index.html'
+        response = self.publish(path, basic='mgr:mgrpw')
+        self.assertEqual(response.getHeader('X-APIDoc-Timing'), None)
+
+        response = self.publish(path, basic='mgr:mgrpw',
+                                env={'HTTP_X_APIDOC_TIMING': '1'})
+        self.assertEqual(response.getStatus(), 200)
+        header = response.getHeader('X-APIDoc-Timing')
+        for phase in ('traversal', 'registry', 'renderText', 'template',
+                      'total'):
+            self.assert_(phase + '=' in header)
+        self.assert_('apidoc-timing' not in response.getBody())
+
+        response = self.publish(path + '?apidoc-timing=footer',
+                                basic='mgr:mgrpw')
+        self.assert_(response.getHeader('X-APIDoc-Timing'))
+        self.assert_('class="apidoc-timing"' in response.getBody())
+
+    def testMetricsView(self):
+        response = self.publish('/++apidoc++/metrics', basic='mgr:mgrpw')
+        self.assertEqual(response.getStatus(), 200)
+        self.assert_(response.getHeader('Content-Type').startswith(
+            'text/plain'))
+        body = response.getBody()
+        self.assert_('# TYPE apidoc_cache_hits_total counter' in body)
+        self.assert_('apidoc_class_registry_classes ' in body)
+
+        response = self.publish('/++apidoc++/metrics.json', basic='mgr:mgrpw')
+        self.assertEqual(response.getStatus(), 200)
+        metrics = json.loads(response.getBody())
+        self.assert_('component.registrations' in metrics['caches'])
+        self.assert_(metrics['classRegistry'] > 0)
+
+    def testMemoryReportView(self):
+        response = self.publish('/++apidoc++/memory.json', basic='mgr:mgrpw')
+        self.assertEqual(response.getStatus(), 200)
+        report = json.loads(response.getBody())
+        self.assert_(report['total'] > 0)
+        self.assert_(report['categories']['classRegistry']['total'] > 0)
+
+        response = self.publish('/++apidoc++/memory.txt', basic='mgr:mgrpw')
+        self.assertEqual(response.getStatus(), 200)
+        self.assert_('classRegistry' in response.getBody())
+
+    def testLookupView(self):
+        response = self.publish(
+            '/++apidoc++/lookup.json'
+            '?path=zope.app.apidoc.cache.BoundedCache'
+            '&path=zope.app.apidoc.interfaces.IDocumentationModule'
+            '&path=zope.app.apidoc.missing',
+            basic='mgr:mgrpw')
+        self.assertEqual(response.getStatus(), 200)
+        records = json.loads(response.getBody())
+        self.assertEqual(
+            records['zope.app.apidoc.cache.BoundedCache']['type'], 'class')
+        self.assertEqual(
+            records['zope.app.apidoc.interfaces.IDocumentationModule']['type'],
+            'interface')
+        self.assertEqual(records['zope.app.apidoc.missing'], None)
+
+    def testLookupViewIgnoresInvalidPaths(self):
+        response = self.publish(
+            '/++apidoc++/lookup.json', basic='mgr:mgrpw',
+            env={'REQUEST_METHOD': 'POST',
+                 'CONTENT_TYPE': 'application/json'},
+            request_body='[1, [1], {"a": 1}, "zope.app.apidoc.missing"]')
+        self.assertEqual(response.getStatus(), 200)
+        self.assertEqual(json.loads(response.getBody()),
+                         {'zope.app.apidoc.missing': None})
+
 checker = renormalizing.RENormalizing([
     (re.compile(r'httperror_seek_wrapper:', re.M), 'HTTPError:'),
     ]) 
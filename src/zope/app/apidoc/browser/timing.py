@@ -0,0 +1,52 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Timed Documentation Pages
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+from zope.app.apidoc import timing
+
+FOOTER_TEMPLATE = '''\
+<div class="apidoc-timing" style="font-size: 80%%; color: #777">
+  %s
+</div>
+'''
+
+
+class TimedView(object):
+    """Mixin for pages whose rendering is timed.
+
+    If the request asked for it, the time spent in every phase of the request
+    is returned in the ``X-APIDoc-Timing`` response header and, on request,
+    in a footer of the page.
+    """
+
+    def __call__(self, *args, **kw):
+        if not timing.isActive():
+            return super(TimedView, self).__call__(*args, **kw)
+
+        timing.leave(timing.TRAVERSAL)
+        result = timing.measure(
+            timing.TEMPLATE, super(TimedView, self).__call__, *args, **kw)
+        timings = timing.stop()
+
+        summary = timing.formatTimings(timings)
+        self.request.response.setHeader(timing.HEADER, summary)
+        if self.request.form.get(timing.FORM_KEY) == timing.FOOTER and \
+               isinstance(result, basestring) and '</body>' in result:
+            footer = FOOTER_TEMPLATE % summary
+            index = result.rindex('</body>')
+            result = result[:index] + footer + result[index:]
+        return result
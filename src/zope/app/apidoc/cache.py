@@ -0,0 +1,152 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Caches used by the documentation modules
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+
+from collections import deque
+
+from zope.app.apidoc import generation
+
+_marker = object()
+
+# The module-level caches by name, so that they can be monitored.
+_caches = {}
+
+
+def registerCache(name, cache):
+    """Register a cache under a name and return it."""
+    _caches[name] = cache
+    return cache
+
+
+def getCaches():
+    """Return the registered caches as sorted ``(name, cache)`` pairs."""
+    return sorted(_caches.items())
+
+
+class BoundedCache(object):
+    """A mapping of limited size that keeps statistics about its usage.
+
+    When the cache is full, the oldest entries are evicted first.
+    """
+
+    def __init__(self, maxsize=1000):
+        self.maxsize = maxsize
+        self._data = {}
+        self._order = deque()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Return the cached value and record a hit or a miss."""
+        value = self._data.get(key, _marker)
+        if value is _marker:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        """Cache a value, evicting the oldest entries if necessary."""
+        if key not in self._data:
+            self._order.append(key)
+        self._data[key] = value
+        while len(self._data) > self.maxsize:
+            oldest = self._order.popleft()
+            if oldest in self._data:
+                del self._data[oldest]
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """Remove a single entry from the cache, if it exists."""
+        if key in self._data:
+            del self._data[key]
+            self._order.remove(key)
+
+    def clear(self):
+        """Remove all entries; the statistics are kept."""
+        self._data.clear()
+        self._order.clear()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def values(self):
+        """Return the cached values; no hits are recorded."""
+        return self._data.values()
+
+    def items(self):
+        """Return the cached ``(key, value)`` pairs; no hits are recorded."""
+        return self._data.items()
+
+    def getStatistics(self):
+        """Return a dictionary with the usage statistics of the cache."""
+        lookups = self.hits + self.misses
+        return {'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': lookups and float(self.hits) / lookups or 0.0}
+
+
+class GenerationalCache(BoundedCache):
+    """A bounded cache whose entries are valid for one generation only.
+
+    As soon as the generation of the cached `source` changes (see the
+    `generation` module), all entries are dropped.
+    """
+
+    def __init__(self, maxsize=1000, source=generation.COMPONENTS):
+        super(GenerationalCache, self).__init__(maxsize)
+        self.source = source
+        self.generation = generation.getGeneration(source)
+
+    def validate(self):
+        """Drop all entries, if the generation changed."""
+        current = generation.getGeneration(self.source)
+        if current != self.generation:
+            self.clear()
+            self.generation = current
+
+    def get(self, key, default=None):
+        """See `BoundedCache`."""
+        self.validate()
+        return super(GenerationalCache, self).get(key, default)
+
+    def set(self, key, value, generation=None):
+        """Cache a value.
+
+        `generation` is the generation the value was computed in. If it is
+        given and outdated, the value is not cached.
+        """
+        self.validate()
+        if generation is not None and generation != self.generation:
+            return
+        super(GenerationalCache, self).set(key, value)
+
+    def __contains__(self, key):
+        self.validate()
+        return super(GenerationalCache, self).__contains__(key)
+
+    def __len__(self):
+        self.validate()
+        return super(GenerationalCache, self).__len__()
@@ -23,11 +23,37 @@ __import_unknown_modules__ = False
 # TODO: List hard-coded for now.
 IGNORE_MODULES = ['twisted']
 
+# Modules that could not be imported by an import probe (see the `probe`
+# module), mapping the Python path to the reason. Those are never imported.
+UNIMPORTABLE_MODULES = {}
+
 import sys
 
+from zope.app.apidoc import generation
+from zope.app.apidoc import timing
+from zope.app.apidoc.importprofile import importProfile
+
 class ClassRegistry(dict):
-    """A simple registry for classes."""
+    """A simple registry for classes.
+
+    Every change starts a new generation of the classes (see the `generation`
+    module).
+    """
+
+    def __setitem__(self, path, klass):
+        if self.get(path) is not klass:
+            dict.__setitem__(self, path, klass)
+            generation.bump(generation.CLASSES)
 
+    def __delitem__(self, path):
+        dict.__delitem__(self, path)
+        generation.bump(generation.CLASSES)
+
+    def clear(self):
+        dict.clear(self)
+        generation.bump(generation.CLASSES)
+
+    @timing.timed(timing.REGISTRY)
     def getClassesThatImplement(self, iface):
         """Return all class items that implement iface.
 
@@ -36,6 +62,7 @@ class ClassRegistry(dict):
         return [(path, klass) for path, klass in self.items()
                 if iface.implementedBy(klass)]
 
+    @timing.timed(timing.REGISTRY)
     def getSubclassesOf(self, klass):
         """Return all class items that are proper subclasses of klass.
 
@@ -49,6 +76,7 @@ classRegistry = ClassRegistry()
 
 def cleanUp():
     classRegistry.clear()
+    UNIMPORTABLE_MODULES.clear()
 
 from zope.testing.cleanup import addCleanUp
 addCleanUp(cleanUp)
@@ -60,13 +88,19 @@ def safe_import(path, default=None):
     for exclude_name in IGNORE_MODULES:
         if path.startswith(exclude_name):
             return default
-    if module is default and __import_unknown_modules__:
+    if module is default and __import_unknown_modules__ and \
+           path not in UNIMPORTABLE_MODULES:
+        profiled = importProfile.enabled
+        if profiled:
+            started = importProfile.start()
         try:
             module = __import__(path, {}, {}, ('*',))
         except ImportError:
-            return default
+            module = default
         # Some software, we cannot control, might raise all sorts of errors;
         # thus catch all exceptions and return the default.
         except Exception, error:
-            return default
+            module = default
+        if profiled:
+            importProfile.stop('import', path, started)
     return module
@@ -27,9 +27,13 @@ from zope.traversing.browser import absoluteURL
 from zope.traversing.interfaces import TraversalError
 
 from zope.app.apidoc.interfaces import IDocumentationModule
-from zope.app.apidoc.utilities import getPythonPath, getPermissionIds
+from zope.app.apidoc.codemodule.interfaces import IFunctionDocumentation
+from zope.app.apidoc.codemodule.source import SourceExpression
+from zope.app.apidoc.utilities import getPythonPath, getPermissionTable
 from zope.app.apidoc.utilities import renderText, getFunctionSignature
 from zope.app.apidoc.utilities import isReferencable
+from zope.app.apidoc.browser.conditional import ConditionalView
+from zope.app.apidoc.browser.timing import TimedView
 
 
 def getTypeLink(type):
@@ -45,7 +49,7 @@ def getInterfaceInfo(iface):
     return {'path': path,
             'url': isReferencable(path) and path or None}
 
-class ClassDetails(object):
+class ClassDetails(TimedView, ConditionalView):
     """Represents the details of the class."""
 
     def getBases(self):
@@ -70,7 +74,11 @@ class ClassDetails(object):
             # zope.app.i18n.messagecatalog.MessageCatalog prevent us from
             # accessing __name__ and __module__.
             unwrapped_cls = removeAllProxies(cls)
-            path = getPythonPath(unwrapped_cls)
+            if isinstance(unwrapped_cls, basestring):
+                # Classes documented from the source are only known by path.
+                path = unwrapped_cls
+            else:
+                path = getPythonPath(unwrapped_cls)
             url = None
             try:
                 klass = traverse(codeModule, path.replace('.', '/'))
@@ -101,16 +109,21 @@ class ClassDetails(object):
         # remove the security proxy, so that `attr` is not proxied. We could
         # unproxy `attr` for each turn, but that would be less efficient.
         #
-        # `getPermissionIds()` also expects the class's security checker not
-        # to be proxied.
+        # `getPermissionTable()` also expects the class's security checker
+        # not to be proxied.
         klass = removeSecurityProxy(self.context)
+        permissions = getPermissionTable(klass.getSecurityChecker())
         for name, attr, iface in klass.getAttributes():
             entry = {'name': name,
                      'value': `attr`,
                      'type': type(attr).__name__,
                      'type_link': getTypeLink(type(attr)),
                      'interface': getInterfaceInfo(iface)}
-            entry.update(getPermissionIds(name, klass.getSecurityChecker()))
+            if isinstance(attr, SourceExpression):
+                # The expression was not evaluated, so the type is unknown.
+                entry['type'] = 'unknown'
+                entry['type_link'] = None
+            entry.update(permissions.getPermissionIds(name))
             attrs.append(entry)
         return attrs
 
@@ -121,25 +134,24 @@ class ClassDetails(object):
         # remove the security proxy, so that `attr` is not proxied. We could
         # unproxy `attr` for each turn, but that would be less efficient.
         #
-        # `getPermissionIds()` also expects the class's security checker not
-        # to be proxied.
+        # `getPermissionTable()` also expects the class's security checker
+        # not to be proxied.
         klass = removeSecurityProxy(self.context)
+        permissions = getPermissionTable(klass.getSecurityChecker())
         for name, attr, iface in klass.getMethodDescriptors():
             entry = {'name': name,
                      'signature': "(...)",
                      'doc': renderText(attr.__doc__ or '',
                                        inspect.getmodule(attr)),
                      'interface': getInterfaceInfo(iface)}
-            entry.update(getPermissionIds(name, klass.getSecurityChecker()))
+            entry.update(permissions.getPermissionIds(name))
             methods.append(entry)
 
         for name, attr, iface in klass.getMethods():
             entry = {'name': name,
-                     'signature': getFunctionSignature(attr),
-                     'doc': renderText(attr.__doc__ or '',
-                                       inspect.getmodule(attr)),
                      'interface': getInterfaceInfo(iface)}
-            entry.update(getPermissionIds(name, klass.getSecurityChecker()))
+            entry.update(self._getFunctionInfo(attr))
+            entry.update(permissions.getPermissionIds(name))
             methods.append(entry)
         return methods
 
@@ -154,8 +166,14 @@ class ClassDetails(object):
         attr = self.context.getConstructor()
         if attr is None:
             return None
-        attr = removeSecurityProxy(attr)
-        return {
-            'signature': getFunctionSignature(attr),
-            'doc': renderText(attr.__doc__ or '', inspect.getmodule(attr)),
-            }
+        return self._getFunctionInfo(removeSecurityProxy(attr))
+
+    def _getFunctionInfo(self, attr):
+        """Return the signature and the rendered doc string of a method."""
+        if IFunctionDocumentation.providedBy(attr):
+            # Methods of classes documented from the source code
+            return {'signature': attr.getSignature(),
+                    'doc': renderText(attr.getDocString() or '',
+                                      getParent(self.context).getPath())}
+        return {'signature': getFunctionSignature(attr),
+                'doc': renderText(attr.__doc__ or '', inspect.getmodule(attr))}
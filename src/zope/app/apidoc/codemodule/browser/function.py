@@ -22,10 +22,11 @@ from zope.traversing.browser import absoluteURL
 
 from zope.app.apidoc.interfaces import IDocumentationModule
 from zope.app.apidoc.utilities import renderText
+from zope.app.apidoc.browser.conditional import ConditionalView
 
 from class_ import getTypeLink
 
-class FunctionDetails(object):
+class FunctionDetails(ConditionalView):
     """Represents the details of the function."""
 
     def getDocString(self):
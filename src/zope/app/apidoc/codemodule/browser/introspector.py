@@ -133,10 +133,12 @@ class Introspector(BrowserView):
         # remove the security proxy, so that `attr` is not proxied. We could
         # unproxy `attr` for each turn, but that would be less efficient.
         #
-        # `getPermissionIds()` also expects the class's security checker not
-        # to be proxied.
+        # `getPermissionTable()` also expects the class's security checker
+        # not to be proxied.
         klass = zope.security.proxy.removeSecurityProxy(self.klassView.context)
         obj = zope.security.proxy.removeSecurityProxy(self.context)
+        permissions = apidoc.utilities.getPermissionTable(
+            klass.getSecurityChecker())
 
         for name in apidoc.utilities.getPublicAttributes(obj):
             value = getattr(obj, name)
@@ -148,21 +150,22 @@ class Introspector(BrowserView):
                 'value_linkable': IPhysicallyLocatable(value, False) and True,
                 'type': type(value).__name__,
                 'type_link': getTypeLink(type(value)),
-                'interface': apidoc.utilities.getInterfaceForAttribute(
-                                 name, klass._Class__all_ifaces)
+                'interface': apidoc.utilities.getPythonPath(
+                                 klass.getInterfaceForAttribute(name))
                 }
-            entry.update(apidoc.utilities.getPermissionIds(
-                name, klass.getSecurityChecker()))
+            entry.update(permissions.getPermissionIds(name))
             yield entry
 
     def getMethods(self):
         # remove the security proxy, so that `attr` is not proxied. We could
         # unproxy `attr` for each turn, but that would be less efficient.
         #
-        # `getPermissionIds()` also expects the class's security checker not
-        # to be proxied.
+        # `getPermissionTable()` also expects the class's security checker
+        # not to be proxied.
         klass = zope.security.proxy.removeSecurityProxy(self.klassView.context)
         obj = zope.security.proxy.removeSecurityProxy(self.context)
+        permissions = apidoc.utilities.getPermissionTable(
+            klass.getSecurityChecker())
 
         for name in apidoc.utilities.getPublicAttributes(obj):
             val = getattr(obj, name)
@@ -179,11 +182,10 @@ class Introspector(BrowserView):
                 'doc': apidoc.utilities.renderText(
                      val.__doc__ or '',
                      getParent(self.klassView.context).getPath()),
-                'interface': apidoc.utilities.getInterfaceForAttribute(
-                     name, klass._Class__all_ifaces)}
+                'interface': apidoc.utilities.getPythonPath(
+                     klass.getInterfaceForAttribute(name))}
 
-            entry.update(apidoc.utilities.getPermissionIds(
-                name, klass.getSecurityChecker()))
+            entry.update(permissions.getPermissionIds(name))
 
             yield entry
 
@@ -22,8 +22,10 @@ from zope.traversing.browser import absoluteURL
 
 from zope.app.apidoc.interfaces import IDocumentationModule
 from zope.app.apidoc.classregistry import classRegistry
+from zope.app.apidoc.codemodule.codemodule import populateClassRegistry
+from zope.app.apidoc.browser.timing import TimedView
 
-class Menu(object):
+class Menu(TimedView):
     """Menu for the Class Documentation Module.
 
     The menu allows for looking for classes by partial names. See
@@ -33,6 +35,10 @@ class Menu(object):
     def findClasses(self):
         """Find the classes that match a partial path.
 
+        The classes are searched in the class registry. In lazy mode, it only
+        contains the classes of the modules that were set up so far, unless
+        the ``all`` form value asks for setting up the entire tree first.
+
         Examples::
           >>> from zope.app.apidoc.codemodule.class_ import Class
 
@@ -83,10 +89,31 @@ class Menu(object):
           [{'path': 'zope.app.apidoc.codemodule.browser.Blah',
             'url': 'http://127.0.0.1/++apidoc++/Code/zope/app/apidoc/codemodule/browser/Blah/'}]
 
+          The entire tree is only set up, if that is requested:
+
+          >>> from zope.app.apidoc.codemodule.codemodule import CodeModule
+          >>> code = CodeModule()
+          >>> def expand():
+          ...     print 'expanded'
+          >>> code.expand = expand
+          >>> from zope.app.testing import ztapi
+          >>> ztapi.provideUtility(IDocumentationModule, code, 'Code')
+
+          >>> menu.request = TestRequest(form={'path': 'NoSuchClass'})
+          >>> menu.findClasses()
+          []
+          >>> menu.request = TestRequest(form={'path': 'NoSuchClass',
+          ...                                  'all': 'on'})
+          >>> menu.findClasses()
+          expanded
+          []
         """
         path = self.request.get('path', None)
         if path is None:
             return []
+        if self.request.get('all'):
+            # Register the classes of all modules, even in lazy mode
+            populateClassRegistry()
         classModule = getUtility(IDocumentationModule, "Code")
         results = []
         for p in classRegistry.keys():
@@ -135,8 +162,10 @@ class Menu(object):
           >>> len(info) > 3
           True
         """
+        # All classes are listed, so set up the entire tree, if that was not
+        # done yet.
+        populateClassRegistry()
         classModule = getUtility(IDocumentationModule, "Code")
-        classModule.setup() # run setup if not yet done
         results = []
         counter = 0
         for p in classRegistry.keys():
@@ -33,6 +33,8 @@ from zope.app.apidoc.codemodule.interfaces import IFunctionDocumentation
 from zope.app.apidoc.codemodule.interfaces import IZCMLFile
 from zope.app.apidoc.codemodule.interfaces import ITextFile
 from zope.app.apidoc.browser.utilities import findAPIDocumentationRootURL
+from zope.app.apidoc.browser.conditional import ConditionalView
+from zope.app.apidoc.browser.timing import TimedView
 
 
 def formatDocString(text, module=None, summary=False):
@@ -59,7 +61,7 @@ def formatDocString(text, module=None, summary=False):
     return renderText('\n'.join(lines), module)
 
 
-class ModuleDetails(BrowserView):
+class ModuleDetails(TimedView, ConditionalView, BrowserView):
     """Represents the details of a module or package."""
 
     def __init__(self, context, request):
@@ -17,8 +17,9 @@ $Id$
 """
 __docformat__ = 'restructuredtext'
 from zope.app.apidoc.utilities import renderText
+from zope.app.apidoc.browser.conditional import ConditionalView
 
-class TextFileDetails(object):
+class TextFileDetails(ConditionalView):
     """Represents the details of the text file."""
 
     def renderedContent(self):
@@ -18,17 +18,57 @@ $Id$
 
 __docformat__ = 'restructuredtext'
 
-from inspect import ismethod, ismethoddescriptor
+import types
+from inspect import getmro, ismethod, ismethoddescriptor
 
+from zope.cachedescriptors.property import Lazy
 from zope.interface import implements, implementedBy
 from zope.security.checker import getCheckerForInstancesOf
 from zope.location.interfaces import ILocation
 
 from zope.app.apidoc.classregistry import classRegistry
-from zope.app.apidoc.utilities import getInterfaceForAttribute
-from zope.app.apidoc.utilities import getPublicAttributes
 from interfaces import IClassDocumentation
 
+# Kinds of class attributes
+ATTRIBUTE = 'attribute'
+METHOD = 'method'
+METHOD_DESCRIPTOR = 'method descriptor'
+
+# Descriptors that are cheap and safe to bind to the class. All other
+# descriptors are documented as they are found in the class dictionary.
+_BINDABLE = (types.FunctionType, classmethod, staticmethod)
+
+
+def getAttributeTable(klass, interfaceMap):
+    """Return a list of ``(name, kind, value, interface)`` tuples.
+
+    The public attributes of the class are found by walking the `__dict__` of
+    the classes in the method resolution order, so that -- unlike `getattr()`
+    -- arbitrary descriptors are not triggered. The list is sorted by name.
+    """
+    found = {}
+    for cls in getmro(klass):
+        for name, value in cls.__dict__.items():
+            if name.startswith('_') or name in found:
+                continue
+            if isinstance(value, _BINDABLE):
+                value = value.__get__(None, klass)
+            found[name] = value
+
+    table = []
+    names = found.keys()
+    names.sort()
+    for name in names:
+        value = found[name]
+        if ismethod(value):
+            kind = METHOD
+        elif ismethoddescriptor(value):
+            kind = METHOD_DESCRIPTOR
+        else:
+            kind = ATTRIBUTE
+        table.append((name, kind, value, interfaceMap.get(name)))
+    return table
+
 
 class Class(object):
     """This class represents a class declared in the module."""
@@ -42,7 +82,6 @@ class Class(object):
 
         # Setup interfaces that are implemented by this class.
         self.__interfaces = tuple(implementedBy(klass))
-        all_ifaces = {}
         self.__all_ifaces = tuple(implementedBy(klass).flattened())
 
         # Register the class with the global class registry.
@@ -68,28 +107,38 @@ class Class(object):
         """See IClassDocumentation."""
         return self.__interfaces
 
-    def _iterAllAttributes(self):
-        for name in getPublicAttributes(self.__klass):
-            iface = getInterfaceForAttribute(
-                    name, self.__all_ifaces, asPath=False)
-            yield name, getattr(self.__klass, name), iface
+    def _interfaceMap(self):
+        # Map attribute names to the first interface declaring them.
+        ifaces = {}
+        for iface in self.__all_ifaces:
+            for name in iface.names():
+                ifaces.setdefault(name, iface)
+        return ifaces
+    _interfaceMap = Lazy(_interfaceMap)
+
+    def _attributeTable(self):
+        return getAttributeTable(self.__klass, self._interfaceMap)
+    _attributeTable = Lazy(_attributeTable)
+
+    def _listAttributes(self, kind):
+        return [(name, obj, iface)
+                for name, kind_, obj, iface in self._attributeTable
+                if kind_ == kind]
+
+    def getInterfaceForAttribute(self, name):
+        """See IClassDocumentation."""
+        return self._interfaceMap.get(name)
 
     def getAttributes(self):
         """See IClassDocumentation."""
-        return [(name, obj, iface)
-                for name, obj, iface in self._iterAllAttributes()
-                if not (ismethod(obj) or ismethoddescriptor(obj))]
+        return self._listAttributes(ATTRIBUTE)
 
     def getMethods(self):
         """See IClassDocumentation."""
-        return [(name, obj, iface)
-                for name, obj, iface in self._iterAllAttributes()
-                if ismethod(obj)]
+        return self._listAttributes(METHOD)
 
     def getMethodDescriptors(self):
-        return [(name, obj, iface)
-                for name, obj, iface in self._iterAllAttributes()
-                if ismethoddescriptor(obj)]
+        return self._listAttributes(METHOD_DESCRIPTOR)
 
     def getSecurityChecker(self):
         """See IClassDocumentation."""
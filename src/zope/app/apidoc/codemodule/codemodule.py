@@ -19,6 +19,8 @@ documentation for it.
 $Id$
 """
 __docformat__ = 'restructuredtext'
+import time
+import threading
 
 import zope.component
 from zope.i18nmessageid import ZopeMessageFactory as _
@@ -29,6 +31,11 @@ from zope.app.apidoc.classregistry import safe_import
 from zope.app.apidoc.codemodule.interfaces import IAPIDocRootModule
 from zope.app.apidoc.codemodule.module import Module
 
+# When set, the files of the modules are checked for changes at most every
+# that many seconds, and the changed modules are refreshed. The checks run in
+# a background thread, so that requests never wait for them.
+__refresh_interval__ = None
+
 
 class CodeModule(Module):
     """Represent the code browser documentation root"""
@@ -63,16 +70,84 @@ class CodeModule(Module):
         """Initialize object."""
         super(CodeModule, self).__init__(None, '', None, False)
         self.__isSetup = False
+        self._lastCheck = 0
+        self._refreshThread = None
+        # The duration of the setup and the time the tree was last built.
+        self.setupDuration = None
+        self.lastRebuild = None
 
     def setup(self):
         """Setup module and class tree."""
         if self.__isSetup:
             return
-        for name, mod in zope.component.getUtilitiesFor(IAPIDocRootModule):
-            module = safe_import(mod)
-            if module is not None:
-                self._children[name] = Module(self, name, module)
-        self.__isSetup = True
+        # Only one thread sets up the tree; the others wait for it.
+        self._lock.acquire()
+        try:
+            if self.__isSetup:
+                return
+            started = time.time()
+            children = {}
+            for name, mod in zope.component.getUtilitiesFor(
+                IAPIDocRootModule):
+                module = safe_import(mod)
+                if module is not None:
+                    children[name] = Module(self, name, module)
+            self._children = children
+            self._updateNodes()
+            self._lastCheck = self.lastRebuild = time.time()
+            self.setupDuration = self.lastRebuild - started
+            self.__isSetup = True
+        finally:
+            self._lock.release()
+
+    def refresh(self):
+        """See Module class."""
+        if not self.__isSetup:
+            return []
+        refreshed = []
+        for child in self._children.values():
+            refreshed.extend(child.refresh())
+        if refreshed:
+            self.lastRebuild = time.time()
+        return refreshed
+
+    def checkForChanges(self):
+        """Refresh the changed modules, if the refresh interval passed.
+
+        The refresh runs in a background thread; only one such thread runs
+        at a time. The thread is returned, if one was started.
+        """
+        interval = __refresh_interval__
+        if interval is None:
+            return None
+        now = time.time()
+        if now - self._lastCheck < interval:
+            return None
+        self._lock.acquire()
+        try:
+            if now - self._lastCheck < interval or \
+                   self._refreshThread is not None:
+                return None
+            self._lastCheck = now
+            thread = threading.Thread(target=self._refreshInBackground,
+                                      name='apidoc-refresh')
+            thread.setDaemon(True)
+            self._refreshThread = thread
+        finally:
+            self._lock.release()
+        thread.start()
+        return thread
+
+    def _refreshInBackground(self):
+        try:
+            self.refresh()
+        finally:
+            self._refreshThread = None
+
+    def expand(self):
+        """See Module class."""
+        self.setup()
+        super(CodeModule, self).expand()
 
     def getDocString(self):
         """See Module class."""
@@ -93,9 +168,21 @@ class CodeModule(Module):
     def get(self, key, default=None):
         """See zope.container.interfaces.IReadContainer."""
         self.setup()
+        self.checkForChanges()
         return super(CodeModule, self).get(key, default)
 
     def items(self):
         """See zope.container.interfaces.IReadContainer."""
         self.setup()
+        self.checkForChanges()
         return super(CodeModule, self).items()
+
+
+def populateClassRegistry():
+    """Setup the entire code tree, so that all classes are registered.
+
+    This is useful in lazy mode, where only the visited modules are set up.
+    """
+    code = zope.component.queryUtility(IDocumentationModule, 'Code')
+    if code is not None:
+        code.expand()
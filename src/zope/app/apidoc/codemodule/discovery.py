@@ -0,0 +1,167 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Discovery of package contents in directories and zip archives
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+import os
+import stat
+import zipfile
+from StringIO import StringIO
+
+# Directory listings, keyed by the path of the directory. Each listing is a
+# tuple of ``(name, isdir)`` pairs.
+_listings = {}
+
+# The contents of zip archives, keyed by the path of the archive. Each value
+# maps the directories inside the archive to their listing.
+_archives = {}
+
+
+def _readArchive(archive):
+    """Read the central directory of an archive and index its directories."""
+    directories = {'': {}}
+    zip = zipfile.ZipFile(archive)
+    try:
+        names = zip.namelist()
+    finally:
+        zip.close()
+    for name in names:
+        parts = name.rstrip('/').split('/')
+        for i in range(len(parts)):
+            parent = '/'.join(parts[:i])
+            isdir = i < len(parts)-1 or name.endswith('/')
+            entries = directories.setdefault(parent, {})
+            entries[parts[i]] = entries.get(parts[i], False) or isdir
+            if isdir:
+                directories.setdefault('/'.join(parts[:i+1]), {})
+    return dict([(dir, tuple(sorted(entries.items())))
+                 for dir, entries in directories.items()])
+
+
+def findArchive(path):
+    """Split a path into an archive and the path inside the archive.
+
+    If the path does not point inside a zip archive, ``(None, None)`` is
+    returned.
+    """
+    inner = []
+    archive = path
+    while archive:
+        if archive in _archives:
+            break
+        if os.path.isfile(archive):
+            if not zipfile.is_zipfile(archive):
+                return None, None
+            _archives[archive] = _readArchive(archive)
+            break
+        head, tail = os.path.split(archive)
+        if head == archive:
+            return None, None
+        inner.insert(0, tail)
+        archive = head
+    else:
+        return None, None
+    return archive, '/'.join(inner)
+
+
+def listDirectory(path):
+    """Return the entries of a directory as a tuple of ``(name, isdir)``.
+
+    The directory may also be located inside a zip archive. ``None`` is
+    returned, if the path is not a directory.
+    """
+    listing = _listings.get(path)
+    if listing is not None:
+        return listing
+
+    if os.path.isdir(path):
+        entries = []
+        for name in os.listdir(path):
+            try:
+                mode = os.stat(os.path.join(path, name)).st_mode
+            except OSError:
+                continue
+            entries.append((name, stat.S_ISDIR(mode)))
+        listing = tuple(sorted(entries))
+    else:
+        archive, inner = findArchive(path)
+        if archive is None:
+            return None
+        listing = _archives[archive].get(inner)
+        if listing is None:
+            return None
+    _listings[path] = listing
+    return listing
+
+
+def isPackage(path):
+    """Check whether the directory is a Python package."""
+    listing = listDirectory(path)
+    if listing is None:
+        return False
+    return ('__init__.py', False) in listing
+
+
+def readFile(path):
+    """Return the content of a file, which may be inside a zip archive.
+
+    Line endings are normalized to ``\\n``.
+    """
+    if os.path.isfile(path):
+        file = open(path, 'rU')
+        try:
+            return file.read()
+        finally:
+            file.close()
+
+    archive, inner = findArchive(path)
+    if archive is None:
+        raise IOError("No such file: %r" % path)
+    zip = zipfile.ZipFile(archive)
+    try:
+        content = zip.read(inner)
+    finally:
+        zip.close()
+    return content.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def openFile(path):
+    """Return a file object for a file, which may be inside a zip archive."""
+    if os.path.isfile(path):
+        return open(path)
+    file = StringIO(readFile(path))
+    file.name = path
+    return file
+
+
+def invalidate(path):
+    """Forget the listing of a directory, for example after it changed."""
+    _listings.pop(path, None)
+
+
+def getStatistics():
+    """Return the number of cached directory listings and archives."""
+    return {'listings': len(_listings), 'archives': len(_archives)}
+
+
+def clear():
+    """Forget all directory listings and archive contents."""
+    _listings.clear()
+    _archives.clear()
+
+# Make sure that the caches are cleared after each test.
+from zope.testing.cleanup import addCleanUp
+addCleanUp(clear)
@@ -107,6 +107,13 @@ class IClassDocumentation(zope.interface.Interface):
         descriptors that do not start with an '_'-character.
         """
 
+    def getInterfaceForAttribute(name):
+        """Return the interface in which the attribute is declared.
+
+        ``None`` is returned, if no implemented interface declares the
+        attribute.
+        """
+
     def getSecurityChecker():
         """Return the security checker for this class.
 
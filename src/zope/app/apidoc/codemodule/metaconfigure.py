@@ -20,6 +20,8 @@ from zope.interface import implements
 from zope.component.zcml import utility
 
 from zope.app.apidoc import classregistry
+from zope.app.apidoc.importprofile import importProfile
+from zope.app.apidoc.codemodule import codemodule, module
 from zope.app.apidoc.codemodule.interfaces import IAPIDocRootModule
 
 
@@ -40,3 +42,54 @@ def moduleImport(_context, allow):
         ('apidoc', '__import_unknown_modules__'),
         setModuleImport,
         (allow, ))
+
+
+def setModuleSetup(lazy):
+    module.__lazy_setup__ = lazy
+
+def setRefreshInterval(interval):
+    codemodule.__refresh_interval__ = interval
+
+def setModuleReload(flag):
+    module.__reload_modules__ = flag
+
+def setModuleSource(flag):
+    module.__source_modules__ = flag
+
+def moduleSetup(_context, lazy=None, refresh=None, reload=None, source=None):
+    """Set the __lazy_setup__, __refresh_interval__, __reload_modules__ and
+    __source_modules__ flags.
+
+    Only the flags whose attributes are given are set.
+    """
+    if lazy is not None:
+        _context.action(
+            ('apidoc', '__lazy_setup__'),
+            setModuleSetup,
+            (lazy, ))
+    if refresh is not None:
+        _context.action(
+            ('apidoc', '__refresh_interval__'),
+            setRefreshInterval,
+            (refresh, ))
+    if reload is not None:
+        _context.action(
+            ('apidoc', '__reload_modules__'),
+            setModuleReload,
+            (reload, ))
+    if source is not None:
+        _context.action(
+            ('apidoc', '__source_modules__'),
+            setModuleSource,
+            (source, ))
+
+
+def setImportProfile(enabled):
+    importProfile.enabled = enabled
+
+def importProfileDirective(_context, enabled):
+    """Enable or disable the import profile"""
+    return _context.action(
+        ('apidoc', 'importProfile'),
+        setImportProfile,
+        (enabled, ))
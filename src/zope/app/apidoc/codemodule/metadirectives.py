@@ -39,3 +39,54 @@ class IModuleImport(zope.interface.Interface):
         required=True,
         default=False
         )
+
+class IModuleSetup(zope.interface.Interface):
+    """Set a flag whether the code browser sets up modules lazily or not."""
+
+    lazy = zope.schema.Bool(
+        title=u"Set Up Modules Lazily",
+        description=u"When set to true, the children of a module are only "
+                    u"discovered when the module is accessed.",
+        required=False,
+        default=False
+        )
+
+    refresh = zope.schema.Int(
+        title=u"Refresh Interval",
+        description=u"When set, the files of the modules are checked for "
+                    u"changes at most every that many seconds, and the "
+                    u"changed modules are set up again.",
+        required=False,
+        min=0
+        )
+
+    reload = zope.schema.Bool(
+        title=u"Reload Changed Modules",
+        description=u"When set to true, Python modules whose source files "
+                    u"changed are reloaded on refresh, so that their new "
+                    u"classes and functions are documented. This runs the "
+                    u"module code again, so only use it during development.",
+        required=False,
+        default=False
+        )
+
+    source = zope.schema.Bool(
+        title=u"Document Modules From Their Source",
+        description=u"When set to true, the modules of a package that are "
+                    u"not imported yet are documented from their source "
+                    u"code instead of importing them.",
+        required=False,
+        default=False
+        )
+
+class IImportProfile(zope.interface.Interface):
+    """Set a flag whether the cost of importing and documenting modules is
+       recorded or not."""
+
+    enabled = zope.schema.Bool(
+        title=u"Enable Import Profile",
+        description=u"When set to true, the time and memory it takes to "
+                    u"import and document modules are recorded.",
+        required=True,
+        default=False
+        )
@@ -17,7 +17,9 @@ $Id$
 """
 __docformat__ = 'restructuredtext'
 import os
+import sys
 import types
+import threading
 
 import zope
 from zope.interface import implements
@@ -27,10 +29,14 @@ from zope.location.interfaces import ILocation
 from zope.location import LocationProxy
 from zope.hookable import hookable
 
-from zope.app.apidoc.classregistry import safe_import
+from zope.app.apidoc import generation
+from zope.app.apidoc.cache import BoundedCache
+from zope.app.apidoc.classregistry import safe_import, classRegistry
+from zope.app.apidoc.importprofile import importProfile
 from zope.app.apidoc.utilities import ReadContainerBase
 from interfaces import IModuleDocumentation
 
+from zope.app.apidoc.codemodule import discovery
 from zope.app.apidoc.codemodule.class_ import Class
 from zope.app.apidoc.codemodule.function import Function
 from zope.app.apidoc.codemodule.text import TextFile
@@ -41,6 +47,27 @@ from zope.app.apidoc.codemodule.zcml import ZCMLFile
 IGNORE_FILES = ('tests', 'tests.py', 'ftests', 'ftests.py', 'CVS', 'gadfly',
                 'setup.py', 'introspection.py', 'Mount.py')
 
+# When set, modules discover their children only when they are first
+# accessed, instead of setting up the entire sub-tree at once.
+__lazy_setup__ = False
+
+# When set, `Module.refresh()` reloads the Python modules whose source files
+# changed, so that their new classes and functions are documented. Reloading
+# runs the module code of the application again and leaves the old classes
+# referenced elsewhere, so it must be enabled explicitly.
+__reload_modules__ = False
+
+# When set, the modules of a package that are not imported yet are documented
+# from their source code (see `source.SourceModule`) instead of importing them.
+__source_modules__ = False
+
+# The maximum number of modules per package that are found by `Module.get()`
+# without being children of the package and kept for later lookups.
+MAX_DYNAMIC_MODULES = 100
+
+# Serializes the updates of the node counts of the ancestors of a module.
+_countLock = threading.Lock()
+
 class Module(ReadContainerBase):
     """This class represents a Python module."""
     implements(ILocation, IModuleDocumentation)
@@ -51,52 +78,124 @@ class Module(ReadContainerBase):
         self.__name__ = name
         self._module = module
         self._children = {}
-        self._package = False
-        if setup:
-            self.__setup()
-
-    def __setup(self):
-        """Setup the module sub-tree."""
+        # Created on first use, since most modules never need it.
+        self._dynamic = None
+        self._expanded = False
+        self._mtimes = {}
+        self._lock = threading.RLock()
+        # The number of nodes in the sub-tree that are set up
+        self._nodes = 0
         # Detect packages
-        if hasattr(self._module, '__file__') and \
+        self._package = hasattr(self._module, '__file__') and \
                (self._module.__file__.endswith('__init__.py') or
                 self._module.__file__.endswith('__init__.pyc')or
-                self._module.__file__.endswith('__init__.pyo')):
-            self._package = True
+                self._module.__file__.endswith('__init__.pyo'))
+        self._setupPending = setup and __lazy_setup__
+        if setup and not __lazy_setup__:
+            self.__setup()
+
+    def _ensureSetup(self):
+        """Setup the module, if that was deferred in lazy mode.
+
+        Concurrent requests wait for the thread that sets up the module and
+        then share the result.
+        """
+        if not self._setupPending:
+            return
+        self._lock.acquire()
+        try:
+            if self._setupPending:
+                self.__setup()
+                self._setupPending = False
+        finally:
+            self._lock.release()
+
+    def expand(self):
+        """Setup the entire sub-tree, so that all classes are registered."""
+        if self._expanded:
+            return
+        self._ensureSetup()
+        for child in self._children.values():
+            if isinstance(child, Module):
+                child.expand()
+        self._expanded = True
+
+    def __setup(self, previous=None):
+        """Setup the module sub-tree.
+
+        Nodes of a `previous` setup are reused, if they still document the
+        same module or file.
+        """
+        if previous is None:
+            previous = {}
+        profiled = importProfile.enabled
+        if profiled:
+            started = importProfile.start()
+        # The children are collected first, so that other threads never see
+        # a partially set up module.
+        children = {}
+        if self._package:
             for dir in self._module.__path__:
-                # TODO: If we are dealing with eggs, we will not have a
-                # directory right away. For now we just ignore zipped eggs;
-                # later we want to unzip it.
-                if not os.path.isdir(dir):
+                # The directory may also be located inside a zipped egg.
+                entries = discovery.listDirectory(dir)
+                if entries is None:
                     continue
-                for file in os.listdir(dir):
-                    if file in IGNORE_FILES or file in self._children:
+                for file, isdir in entries:
+                    if file in IGNORE_FILES or file in children:
                         continue
                     path = os.path.join(dir, file)
 
-                    if (os.path.isdir(path) and
-                        '__init__.py' in os.listdir(path)):
-                        # subpackage
-                        fullname = self._module.__name__ + '.' + file
-                        module = safe_import(fullname)
-                        if module is not None:
-                            self._children[file] = Module(self, file, module)
-
-                    elif os.path.isfile(path) and file.endswith('.py') and \
+                    if isdir:
+                        if discovery.isPackage(path):
+                            # subpackage
+                            fullname = self._module.__name__ + '.' + file
+                            child = self._getSourceModule(
+                                previous.get(file), file, fullname,
+                                os.path.join(path, '__init__.py'), True)
+                            if child is not None:
+                                children[file] = child
+                                continue
+                            module = safe_import(fullname)
+                            child = previous.get(file)
+                            if isinstance(child, Module) and \
+                                   child._module is module:
+                                children[file] = child
+                            elif module is not None:
+                                children[file] = Module(self, file, module)
+
+                    elif file.endswith('.py') and \
                              not file.startswith('__init__'):
                         # module
                         name = file[:-3]
                         fullname = self._module.__name__ + '.' + name
+                        child = self._getSourceModule(
+                            previous.get(name), name, fullname, path)
+                        if child is not None:
+                            children[name] = child
+                            continue
                         module = safe_import(fullname)
-                        if module is not None:
-                            self._children[name] = Module(self, name, module)
-
-                    elif os.path.isfile(path) and file.endswith('.zcml'):
-                        self._children[file] = ZCMLFile(path, self._module,
-                                                        self, file)
-
-                    elif os.path.isfile(path) and file.endswith('.txt'):
-                        self._children[file] = TextFile(path, file, self)
+                        child = previous.get(name)
+                        if isinstance(child, Module) and \
+                               child._module is module:
+                            children[name] = child
+                        elif module is not None:
+                            children[name] = Module(self, name, module)
+
+                    elif file.endswith('.zcml'):
+                        child = previous.get(file)
+                        if isinstance(child, ZCMLFile) and \
+                               child.filename == path:
+                            children[file] = child
+                        else:
+                            children[file] = ZCMLFile(path, self._module,
+                                                      self, file)
+
+                    elif file.endswith('.txt'):
+                        child = previous.get(file)
+                        if isinstance(child, TextFile) and child.path == path:
+                            children[file] = child
+                        else:
+                            children[file] = TextFile(path, file, self)
 
         # List the classes and functions in module, if any are available.
         zope.deprecation.__show__.off()
@@ -126,7 +225,7 @@ class Module(ReadContainerBase):
         for name in names:
             # If there is something the same name beneath, then module should
             # have priority.
-            if name in self._children:
+            if name in children:
                 continue
 
             attr = getattr(self._module, name, None)
@@ -137,10 +236,10 @@ class Module(ReadContainerBase):
 		attr = attr.implementation
 
             if isinstance(attr, (types.ClassType, types.TypeType)):
-                self._children[name] = Class(self, name, attr)
+                children[name] = Class(self, name, attr)
 
             elif isinstance(attr, InterfaceClass):
-                self._children[name] = LocationProxy(attr, self, name)
+                children[name] = LocationProxy(attr, self, name)
 
             elif isinstance(attr, types.FunctionType):
                 doc = attr.__doc__
@@ -148,10 +247,146 @@ class Module(ReadContainerBase):
                     f = module_decl.get(name)
                     if f is not None:
                         doc = f.__doc__
-                self._children[name] = Function(self, name, attr, doc=doc)
+                children[name] = Function(self, name, attr, doc=doc)
 
         zope.deprecation.__show__.on()
-
+        self._children = children
+        self._mtimes = self._getModificationTimes()
+        self._updateNodes()
+        if profiled:
+            importProfile.stop('setup', self.getPath(), started,
+                               len(children))
+
+
+    def _getSourceModule(self, previous, name, fullname, filename,
+                         package=False):
+        """Return the source documentation of a module that is not imported.
+
+        `None` is returned, if modules are not documented from their source
+        code or the module is imported already.
+        """
+        if not __source_modules__ or fullname in sys.modules:
+            return None
+        from zope.app.apidoc.codemodule.source import SourceModule
+        if isinstance(previous, SourceModule) and \
+               previous.getFileName() == filename:
+            return previous
+        return SourceModule(self, name, fullname, filename, package)
+
+    def _getModificationTimes(self):
+        """Return the modification times of the files and directories of the
+        module, which are watched for changes."""
+        paths = []
+        filename = getattr(self._module, '__file__', None)
+        if filename:
+            paths.append(os.path.splitext(filename)[0] + '.py')
+        if self._package:
+            paths.extend(self._module.__path__)
+        for child in self._children.values():
+            if isinstance(child, ZCMLFile):
+                paths.append(child.filename)
+            elif isinstance(child, TextFile):
+                paths.append(child.path)
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+
+    def _updateNodes(self):
+        """Count the nodes of the sub-tree again after the children changed.
+
+        The difference is added to the counts of the ancestors, as long as
+        they contain the module; modules set up while their parent is set up
+        are counted by the parent itself.
+        """
+        _countLock.acquire()
+        try:
+            count = len(self._children)
+            for child in self._children.values():
+                if isinstance(child, Module):
+                    count += child._nodes
+            delta = count - self._nodes
+            self._nodes = count
+            node = self
+            parent = node.__parent__
+            while delta and isinstance(parent, Module) and \
+                      parent._children.get(node.__name__) is node:
+                parent._nodes += delta
+                node, parent = parent, parent.__parent__
+        finally:
+            _countLock.release()
+
+    def countNodes(self):
+        """Return the number of nodes in the sub-tree that are set up.
+
+        Modules that are not set up yet are counted, but not set up. The
+        count is kept up-to-date by the setup and refresh of the modules, so
+        that it is not computed by walking the tree.
+        """
+        return self._nodes
+
+    def refresh(self):
+        """Refresh the parts of the sub-tree whose files changed.
+
+        The Python path of every refreshed module is returned.
+        """
+        if self._setupPending:
+            # Not set up yet, so there is nothing to refresh.
+            return []
+        refreshed = []
+        # The files are checked without holding the lock; it is only
+        # acquired, if something changed.
+        mtimes = self._getModificationTimes()
+        changed = [path for path, mtime in mtimes.items()
+                   if self._mtimes.get(path) != mtime]
+        if changed:
+            self._lock.acquire()
+            try:
+                filename = getattr(self._module, '__file__', None)
+                source = filename and os.path.splitext(filename)[0] + '.py'
+                reloaded = False
+                if source in changed and __reload_modules__:
+                    try:
+                        reload(self._module)
+                        reloaded = True
+                    except Exception:
+                        # Keep documenting the old module.
+                        pass
+                dirs = []
+                if self._package:
+                    dirs = [dir for dir in self._module.__path__
+                            if dir in changed]
+                for dir in dirs:
+                    discovery.invalidate(dir)
+                if reloaded or dirs:
+                    self.__refresh()
+                    refreshed.append(self.getPath())
+                else:
+                    for child in self._children.values():
+                        if isinstance(child, ZCMLFile) and \
+                               child.filename in changed:
+                            child.refresh()
+                    self._mtimes = mtimes
+            finally:
+                self._lock.release()
+
+        for child in self._children.values():
+            if isinstance(child, Module):
+                refreshed.extend(child.refresh())
+        return refreshed
+
+    def __refresh(self):
+        """Setup the module again, reusing the unchanged nodes."""
+        path = self.getPath()
+        for name, klass in classRegistry.items():
+            if name.rsplit('.', 1)[0] == path:
+                del classRegistry[name]
+        self._expanded = False
+        self.__setup(self._children)
+        generation.bump(generation.CODE)
 
     def getDocString(self):
         """See IModuleDocumentation."""
@@ -175,6 +410,7 @@ class Module(ReadContainerBase):
 
     def get(self, key, default=None):
         """See zope.container.interfaces.IReadContainer."""
+        self._ensureSetup()
         obj = self._children.get(key, default)
         if obj is not default:
             return obj
@@ -187,7 +423,19 @@ class Module(ReadContainerBase):
         obj = safe_import(path)
 
         if obj is not None:
-            return Module(self, key, obj)
+            # Setting up a module is expensive, so keep it around. If the
+            # Python module was reloaded, the documentation is set up again.
+            self._lock.acquire()
+            try:
+                if self._dynamic is None:
+                    self._dynamic = BoundedCache(MAX_DYNAMIC_MODULES)
+                module = self._dynamic.get(key)
+                if module is None or module._module is not obj:
+                    module = Module(self, key, obj)
+                    self._dynamic.set(key, module)
+            finally:
+                self._lock.release()
+            return module
 
         # Maybe it is a simple attribute of the module
         if obj is None:
@@ -197,8 +445,23 @@ class Module(ReadContainerBase):
 
         return obj
 
+    def walkItems(self):
+        """Return the items, without keeping the module set up.
+
+        If the setup of the module is still pending, the items are computed
+        by a transient copy of the module, so that walking the entire tree in
+        lazy mode does not keep the entire tree in memory.
+        """
+        if not self._setupPending:
+            return self.items()
+        module = Module(self.__parent__, self.__name__, self._module,
+                        setup=False)
+        module.__setup()
+        return module.items()
+
     def items(self):
         """See zope.container.interfaces.IReadContainer."""
+        self._ensureSetup()
         # Only publicize public objects, even though we do keep track of
         # private ones
         return [(name, value)
@@ -0,0 +1,429 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Module documentation extracted from the source code
+
+The documentation is built from the syntax tree of the modules, so that the
+modules do not have to be imported. The extracted data consists of
+dictionaries, lists and strings only, so that it can be computed in worker
+processes.
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+import os
+import sys
+import ast
+
+from zope.cachedescriptors.property import Lazy
+from zope.interface import implements
+from zope.interface.declarations import Declaration
+from zope.location.interfaces import ILocation
+
+from zope.app.apidoc.utilities import ReadContainerBase
+from zope.app.apidoc.codemodule import discovery
+from zope.app.apidoc.codemodule.interfaces import IModuleDocumentation
+from zope.app.apidoc.codemodule.interfaces import IClassDocumentation
+from zope.app.apidoc.codemodule.interfaces import IFunctionDocumentation
+from zope.app.apidoc.codemodule.module import IGNORE_FILES, Module
+
+
+_OPERATORS = {
+    ast.Add: '+', ast.Sub: '-', ast.Mult: '*', ast.Div: '/',
+    ast.FloorDiv: '//', ast.Mod: '%', ast.Pow: '**', ast.LShift: '<<',
+    ast.RShift: '>>', ast.BitOr: '|', ast.BitXor: '^', ast.BitAnd: '&',
+    ast.UAdd: '+', ast.USub: '-', ast.Invert: '~', ast.Not: 'not ',
+    }
+
+
+def _render(node):
+    """Return the source representation of a default value or base class."""
+    if isinstance(node, ast.Num):
+        return repr(node.n)
+    if isinstance(node, ast.Str):
+        return repr(node.s)
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return _render(node.value) + '.' + node.attr
+    if isinstance(node, ast.Tuple):
+        if len(node.elts) == 1:
+            return '(%s,)' % _render(node.elts[0])
+        return '(%s)' % ', '.join([_render(elt) for elt in node.elts])
+    if isinstance(node, ast.List):
+        return '[%s]' % ', '.join([_render(elt) for elt in node.elts])
+    if isinstance(node, ast.Dict):
+        return '{%s}' % ', '.join(
+            [_render(key) + ': ' + _render(value)
+             for key, value in zip(node.keys, node.values)])
+    if isinstance(node, ast.Call):
+        return _render(node.func) + '(...)'
+    if isinstance(node, ast.UnaryOp):
+        return _OPERATORS.get(type(node.op), '?') + _render(node.operand)
+    if isinstance(node, ast.BinOp):
+        return '%s %s %s' % (_render(node.left),
+                             _OPERATORS.get(type(node.op), '?'),
+                             _render(node.right))
+    return '...'
+
+
+def _argName(node):
+    if isinstance(node, ast.Tuple):
+        return '(' + ', '.join([_argName(elt) for elt in node.elts]) + ')'
+    return node.id
+
+
+def getSignature(node, method=False):
+    """Return the signature of a function definition.
+
+    The signature has the same format as the one returned by
+    `zope.app.apidoc.utilities.getFunctionSignature()`.
+    """
+    args = node.args
+    names = [_argName(arg) for arg in args.args]
+    defaults = [None]*(len(names)-len(args.defaults)) + \
+               [_render(default) for default in args.defaults]
+    str_args = []
+    for name, default in zip(names, defaults):
+        # The self argument is not part of the signature of methods.
+        if method and name == 'self' and not str_args:
+            continue
+        if default is None:
+            str_args.append(name)
+        else:
+            str_args.append(name + '=' + default)
+    if args.vararg:
+        str_args.append('*' + args.vararg)
+    if args.kwarg:
+        str_args.append('**' + args.kwarg)
+    return '(' + ', '.join(str_args) + ')'
+
+
+def _getFunction(node, method=False):
+    return {'name': node.name,
+            'signature': getSignature(node, method),
+            'doc': ast.get_docstring(node, False)}
+
+
+def _getClass(node):
+    methods = []
+    attributes = []
+    for child in node.body:
+        if isinstance(child, ast.FunctionDef):
+            methods.append(_getFunction(child, True))
+        elif isinstance(child, ast.Assign):
+            for target in child.targets:
+                if isinstance(target, ast.Name):
+                    attributes.append((target.id, _render(child.value)))
+    return {'name': node.name,
+            'doc': ast.get_docstring(node, False),
+            'bases': [_render(base) for base in node.bases],
+            'methods': methods,
+            'attributes': attributes}
+
+
+def parseModule(source, filename='<string>'):
+    """Extract the documentation data of a module from its source code."""
+    data = {'file': filename, 'doc': None, 'classes': [], 'functions': [],
+            'all': None, 'error': None}
+    try:
+        tree = compile(source, filename, 'exec', ast.PyCF_ONLY_AST)
+    except (SyntaxError, TypeError, ValueError), error:
+        data['error'] = '%s: %s' % (error.__class__.__name__, error)
+        return data
+
+    data['doc'] = ast.get_docstring(tree, False)
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            data['classes'].append(_getClass(node))
+        elif isinstance(node, ast.FunctionDef):
+            data['functions'].append(_getFunction(node))
+        elif isinstance(node, ast.Assign) and \
+                 isinstance(node.value, (ast.List, ast.Tuple)):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id == '__all__':
+                    data['all'] = [elt.s for elt in node.value.elts
+                                   if isinstance(elt, ast.Str)]
+    return data
+
+
+def extractModule(job):
+    """Extract the documentation data of a module file.
+
+    The job is a ``(path, filename)`` tuple and the result is a
+    ``(path, data)`` tuple. This function can be used with the ``map()``
+    method of a ``multiprocessing.Pool``.
+    """
+    path, filename = job
+    try:
+        source = discovery.readFile(filename)
+    except IOError, error:
+        return path, {'file': filename, 'doc': None, 'classes': [],
+                      'functions': [], 'all': None, 'error': str(error)}
+    return path, parseModule(source, filename)
+
+
+def findModules(directory, path):
+    """Return ``(path, filename)`` jobs for all modules of a package."""
+    jobs = [(path, os.path.join(directory, '__init__.py'))]
+    for name, isdir in discovery.listDirectory(directory) or ():
+        if name in IGNORE_FILES:
+            continue
+        filename = os.path.join(directory, name)
+        if isdir:
+            if discovery.isPackage(filename):
+                jobs.extend(findModules(filename, path + '.' + name))
+        elif name.endswith('.py') and not name.startswith('__init__'):
+            jobs.append((path + '.' + name[:-3], filename))
+    return jobs
+
+
+def extractPackage(directory, path, map=map):
+    """Extract the documentation data of all modules of a package.
+
+    The modules are extracted by the `map` function, so that for example the
+    ``map()`` method of a ``multiprocessing.Pool`` can be passed to extract
+    the modules in parallel. A dictionary from the Python paths of the
+    modules to their data is returned.
+    """
+    return dict(map(extractModule, findModules(directory, path)))
+
+
+class SourceExpression(object):
+    """An expression of the source code, which is not evaluated."""
+
+    def __init__(self, source):
+        self.source = source
+
+    def __repr__(self):
+        return self.source
+
+
+class SourceFunction(object):
+    """A function documented from the source code."""
+    implements(ILocation, IFunctionDocumentation)
+
+    def __init__(self, module, name, data):
+        self.__parent__ = module
+        self.__name__ = name
+        self.__doc__ = data['doc']
+        self._data = data
+
+    def getPath(self):
+        """See IFunctionDocumentation."""
+        return self.__parent__.getPath() + '.' + self.__name__
+
+    def getDocString(self):
+        """See IFunctionDocumentation."""
+        return self.__doc__
+
+    def getSignature(self):
+        """See IFunctionDocumentation."""
+        return self._data['signature']
+
+    def getAttributes(self):
+        """See IFunctionDocumentation."""
+        return []
+
+
+class SourceClass(ReadContainerBase):
+    """A class documented from the source code.
+
+    The methods are the items of the class. Since the class is not imported,
+    its base classes are only known by their source representation, and its
+    interfaces, subclasses and security checker are not known at all.
+    """
+    implements(ILocation, IClassDocumentation)
+
+    def __init__(self, module, name, data):
+        self.__parent__ = module
+        self.__name__ = name
+        self.__doc__ = data['doc']
+        self._data = data
+
+    def getPath(self):
+        """See IClassDocumentation."""
+        return self.__parent__.getPath() + '.' + self.__name__
+
+    def getDocString(self):
+        """See IClassDocumentation."""
+        return self.__doc__
+
+    def getBases(self):
+        """See IClassDocumentation.
+
+        The bases are the source representations of the base classes.
+        """
+        return self._data['bases']
+
+    def getKnownSubclasses(self):
+        """See IClassDocumentation."""
+        return []
+
+    def getInterfaces(self):
+        """See IClassDocumentation."""
+        return []
+
+    def getInterfaceForAttribute(self, name):
+        """See IClassDocumentation."""
+        return None
+
+    def getAttributes(self):
+        """See IClassDocumentation.
+
+        The values are the `SourceExpression` objects assigned in the class
+        body.
+        """
+        return [(name, SourceExpression(value), None)
+                for name, value in self._data['attributes']
+                if not name.startswith('_')]
+
+    def getMethods(self):
+        """See IClassDocumentation.
+
+        The methods are `SourceFunction` objects.
+        """
+        return [(name, method, None) for name, method in self.items()]
+
+    def getMethodDescriptors(self):
+        """See IClassDocumentation."""
+        return []
+
+    def getSecurityChecker(self):
+        """See IClassDocumentation."""
+        return None
+
+    def getConstructor(self):
+        """See IClassDocumentation."""
+        return self.get('__init__')
+
+    def get(self, key, default=None):
+        """See zope.container.interfaces.IReadContainer."""
+        for method in self._data['methods']:
+            if method['name'] == key:
+                return SourceFunction(self, key, method)
+        return default
+
+    def items(self):
+        """See zope.container.interfaces.IReadContainer."""
+        return [(method['name'], SourceFunction(self, method['name'], method))
+                for method in self._data['methods']
+                if not method['name'].startswith('_')]
+
+
+class SourceModule(ReadContainerBase):
+    """A module documented from the source code.
+
+    The source is parsed when the documentation is first accessed, unless
+    the data was already extracted, for example by `extractPackage()`. As
+    soon as the module is imported, the documentation is upgraded to the one
+    of a regular `Module`, which introspects the live module.
+    """
+    implements(ILocation, IModuleDocumentation)
+
+    def __init__(self, parent, name, path, filename, package=False,
+                 data=None):
+        self.__parent__ = parent
+        self.__name__ = name
+        self._path = path
+        self._filename = filename
+        self._package = package
+        self._children = None
+        self._live = None
+        if data is not None:
+            self._data = data
+
+    def _data(self):
+        return extractModule((self._path, self._filename))[1]
+    _data = Lazy(_data)
+
+    def getLiveModule(self):
+        """Return the regular documentation, if the module was imported."""
+        if self._live is None:
+            module = sys.modules.get(self._path)
+            if module is not None:
+                self._live = Module(self.__parent__, self.__name__, module)
+        return self._live
+
+    def _setup(self):
+        children = {}
+        if self._package:
+            directory = os.path.dirname(self._filename)
+            for name, isdir in discovery.listDirectory(directory) or ():
+                if name in IGNORE_FILES:
+                    continue
+                filename = os.path.join(directory, name)
+                if isdir and discovery.isPackage(filename):
+                    children[name] = SourceModule(
+                        self, name, self._path + '.' + name,
+                        os.path.join(filename, '__init__.py'), True)
+                elif not isdir and name.endswith('.py') and \
+                         not name.startswith('__init__'):
+                    children[name[:-3]] = SourceModule(
+                        self, name[:-3], self._path + '.' + name[:-3],
+                        filename)
+
+        names = self._data['all']
+        for data in self._data['classes']:
+            if names is None or data['name'] in names:
+                children.setdefault(data['name'],
+                                    SourceClass(self, data['name'], data))
+        for data in self._data['functions']:
+            if names is None or data['name'] in names:
+                children.setdefault(data['name'],
+                                    SourceFunction(self, data['name'], data))
+        return children
+
+    def getDocString(self):
+        """See IModuleDocumentation."""
+        return self._data['doc']
+
+    def getFileName(self):
+        """See IModuleDocumentation."""
+        return self._filename
+
+    def getPath(self):
+        """See IModuleDocumentation."""
+        return self._path
+
+    def isPackage(self):
+        """See IModuleDocumentation."""
+        return self._package
+
+    def getDeclaration(self):
+        """See IModuleDocumentation."""
+        live = self.getLiveModule()
+        if live is not None:
+            return live.getDeclaration()
+        return Declaration()
+
+    def get(self, key, default=None):
+        """See zope.container.interfaces.IReadContainer."""
+        live = self.getLiveModule()
+        if live is not None:
+            return live.get(key, default)
+        if self._children is None:
+            self._children = self._setup()
+        return self._children.get(key, default)
+
+    def items(self):
+        """See zope.container.interfaces.IReadContainer."""
+        live = self.getLiveModule()
+        if live is not None:
+            return live.items()
+        if self._children is None:
+            self._children = self._setup()
+        return [(name, value)
+                for name, value in self._children.items()
+                if not name.startswith('_')]
+
@@ -16,6 +16,7 @@
 $Id$
 """
 import os
+import threading
 import unittest
 import doctest
 
@@ -23,6 +24,9 @@ from zope.configuration import xmlconfig
 import zope.app.appsetup.appsetup
 from zope.app.testing import placelesssetup
 
+import zope.app.apidoc
+from zope.app.apidoc.codemodule import module
+
 
 def setUp(test):
     placelesssetup.setUp()
@@ -55,14 +59,100 @@ def tearDown(test):
     zope.app.appsetup.appsetup.__config_context = old_context
 
 
+class ConcurrentSetupTests(unittest.TestCase):
+    """Many threads accessing a lazily set up tree at the same time."""
+
+    threads = 20
+
+    def setUp(self):
+        placelesssetup.setUp()
+        self.setups = []
+        self.original = module.Module._Module__setup
+        setups, original = self.setups, self.original
+        def setup(self, *args):
+            setups.append(self.getPath())
+            original(self, *args)
+        module.Module._Module__setup = setup
+        module.__lazy_setup__ = True
+
+    def tearDown(self):
+        module.__lazy_setup__ = False
+        module.Module._Module__setup = self.original
+        placelesssetup.tearDown()
+
+    def hammer(self, func):
+        """Call `func` from many threads at once and return the results."""
+        start = threading.Event()
+        results = []
+        errors = []
+        def worker():
+            start.wait()
+            try:
+                results.append(func())
+            except Exception, error:
+                errors.append(error)
+        threads = [threading.Thread(target=worker)
+                   for i in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), self.threads)
+        return results
+
+    def testLazySetup(self):
+        root = module.Module(None, 'apidoc', zope.app.apidoc)
+        def access():
+            codemodule = root['codemodule']
+            return codemodule, sorted(codemodule.keys())
+        results = self.hammer(access)
+        for codemodule, keys in results:
+            self.assert_(codemodule is results[0][0])
+            self.assertEqual(keys, results[0][1])
+        self.assert_('module' in results[0][1])
+        # Every module was set up exactly once.
+        self.assertEqual(self.setups.count('zope.app.apidoc'), 1)
+        self.assertEqual(
+            self.setups.count('zope.app.apidoc.codemodule'), 1)
+
+    def testDynamicModules(self):
+        import zope.app.apidoc.tests
+        root = module.Module(None, 'apidoc', zope.app.apidoc)
+        results = self.hammer(lambda: root['tests'])
+        for tests in results:
+            self.assert_(tests is results[0])
+
+    def testCodeModuleSetup(self):
+        from zope.component import provideUtility
+        from zope.app.apidoc.codemodule.codemodule import CodeModule
+        from zope.app.apidoc.codemodule.interfaces import IAPIDocRootModule
+        provideUtility('zope.app.apidoc', IAPIDocRootModule,
+                       'zope.app.apidoc')
+        code = CodeModule()
+        results = self.hammer(lambda: code.get('zope.app.apidoc'))
+        for apidoc in results:
+            self.assert_(apidoc is results[0])
+        self.assertEqual(code.keys(), ['zope.app.apidoc'])
+
+
 def test_suite():
     return unittest.TestSuite((
+        unittest.makeSuite(ConcurrentSetupTests),
         doctest.DocFileSuite('README.txt',
                              setUp=setUp, tearDown=tearDown,
                              optionflags=doctest.NORMALIZE_WHITESPACE),
         doctest.DocFileSuite('directives.txt',
                              setUp=placelesssetup.setUp,
                              tearDown=placelesssetup.tearDown),
+        doctest.DocFileSuite('discovery.txt',
+                             setUp=placelesssetup.setUp,
+                             tearDown=placelesssetup.tearDown),
+        doctest.DocFileSuite('source.txt',
+                             setUp=placelesssetup.setUp,
+                             tearDown=placelesssetup.tearDown,
+                             optionflags=doctest.ELLIPSIS),
         ))
 
 if __name__ == '__main__':
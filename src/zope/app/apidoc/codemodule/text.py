@@ -19,6 +19,7 @@ __docformat__ = 'restructuredtext'
 from zope.interface import implements
 from zope.location.interfaces import ILocation
 
+from zope.app.apidoc.codemodule.discovery import readFile
 from zope.app.apidoc.codemodule.interfaces import ITextFile
 
 class TextFile(object):
@@ -31,7 +32,4 @@ class TextFile(object):
         self.__name__ = name
 
     def getContent(self):
-        file = open(self.path, 'rU')
-        content = file.read()
-        file.close()
-        return content.decode('utf-8')
+        return readFile(self.path).decode('utf-8')
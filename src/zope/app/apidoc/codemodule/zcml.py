@@ -28,6 +28,7 @@ from zope.location.interfaces import ILocation
 
 import zope.app.appsetup.appsetup
 
+from zope.app.apidoc.codemodule.discovery import openFile
 from interfaces import IDirective, IRootDirective, IZCMLFile
 
 
@@ -128,8 +129,8 @@ class ZCMLFile(object):
         parser.setContentHandler(handler)
         parser.setFeature(feature_namespaces, True)
 
-        # Now open the file
-        file = open(self.filename)
+        # Now open the file, which may also be located in a zipped egg
+        file = openFile(self.filename)
         src = InputSource(getattr(file, 'name', '<string>'))
         src.setByteStream(file)
 
@@ -145,3 +146,7 @@ class ZCMLFile(object):
         return root
 
     rootElement = Lazy(rootElement)
+
+    def refresh(self):
+        """Parse the file again when the root element is accessed next."""
+        self.__dict__.pop('rootElement', None)
@@ -31,6 +31,9 @@ from zope.interface import Interface
 from zope.interface.interface import InterfaceClass
 from zope.publisher.interfaces import IRequest
 
+from zope.app.apidoc import generation
+from zope.app.apidoc import timing
+from zope.app.apidoc.cache import GenerationalCache, registerCache
 from zope.app.apidoc.classregistry import classRegistry
 from zope.app.apidoc.utilities import relativizePath, truncateSysPath
 from zope.app.apidoc.utilities import getPythonPath, isReferencable, renderText
@@ -41,6 +44,31 @@ SPECIFIC_INTERFACE_LEVEL = 1
 EXTENDED_INTERFACE_LEVEL = 2
 GENERIC_INTERFACE_LEVEL = 4
 
+# The registrations found by the functions below, keyed by the function and
+# its arguments.
+_registrations = registerCache('component.registrations',
+                               GenerationalCache(1000))
+
+# The classes implementing an interface.
+_classes = registerCache('component.classes',
+                         GenerationalCache(1000, generation.CLASSES))
+
+
+@timing.timed(timing.REGISTRY)
+def cached(cache, func, *args):
+    """Return an iterator of the results of a function.
+
+    The results are kept in the cache, until the generation of the cache's
+    source changes.
+    """
+    key = (func.__name__,) + args
+    results = cache.get(key)
+    if results is None:
+        current = generation.getGeneration(cache.source)
+        results = list(func(*args))
+        cache.set(key, results, current)
+    return iter(results)
+
 
 def _adapterishRegistrations(registry):
     for r in registry.registeredAdapters():
@@ -53,6 +81,10 @@ def _adapterishRegistrations(registry):
 
 def getRequiredAdapters(iface, withViews=False):
     """Get adapter registrations where the specified interface is required."""
+    return cached(_registrations, _getRequiredAdapters, iface, withViews)
+
+
+def _getRequiredAdapters(iface, withViews):
     gsm = getGlobalSiteManager()
     for reg in _adapterishRegistrations(gsm):
         # Ignore adapters that have no required interfaces
@@ -69,6 +101,10 @@ def getRequiredAdapters(iface, withViews=False):
 
 def getProvidedAdapters(iface, withViews=False):
     """Get adapter registrations where this interface is provided."""
+    return cached(_registrations, _getProvidedAdapters, iface, withViews)
+
+
+def _getProvidedAdapters(iface, withViews):
     gsm = getGlobalSiteManager()
     for reg in _adapterishRegistrations(gsm):
         # Only get adapters
@@ -110,12 +146,16 @@ def filterAdapterRegistrations(regs, iface, level=SPECIFIC_INTERFACE_LEVEL):
 
 def getClasses(iface):
     """Get the classes that implement this interface."""
-    return classRegistry.getClassesThatImplement(iface)
+    return list(cached(_classes, classRegistry.getClassesThatImplement, iface))
 
 
 def getFactories(iface):
     """Return the factory registrations, who will return objects providing this
     interface."""
+    return cached(_registrations, _getFactories, iface)
+
+
+def _getFactories(iface):
     gsm = getGlobalSiteManager()
     for reg in gsm.registeredUtilities():
         if reg.provided is not IFactory:
@@ -133,6 +173,10 @@ def getFactories(iface):
 
 def getUtilities(iface):
     """Return all utility registrations that provide the interface."""
+    return cached(_registrations, _getUtilities, iface)
+
+
+def _getUtilities(iface):
     gsm = getGlobalSiteManager()
     for reg in gsm.registeredUtilities():
         if reg.provided.isOrExtends(iface):
@@ -285,3 +329,11 @@ def getUtilityInfoDictionary(reg):
             'iface_id': iface_id,
             'path': path,
             'url': url}
+
+
+def _clear():
+    _registrations.clear()
+    _classes.clear()
+
+from zope.testing.cleanup import addCleanUp
+addCleanUp(_clear)
@@ -0,0 +1,372 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Export of the API documentation as JSON lines
+
+The documentation modules are walked and one record is produced per
+documented object. The records are generated one after the other, so that the
+export can be streamed. The records of single objects can be looked up by
+their dotted paths as well.
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+import re
+import sys
+import optparse
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from zope.interface.interfaces import IInterface
+from zope.proxy import removeAllProxies
+from zope.container.interfaces import IReadContainer
+from zope.app.onlinehelp.interfaces import IOnlineHelpTopic
+
+from zope.app.apidoc import component
+from zope.app.apidoc.utilities import getPythonPath, getFunctionSignature
+from zope.app.apidoc.utilities import getPermissionTable
+from zope.app.apidoc.codemodule.interfaces import IModuleDocumentation
+from zope.app.apidoc.codemodule.interfaces import IClassDocumentation
+from zope.app.apidoc.codemodule.interfaces import IFunctionDocumentation
+from zope.app.apidoc.codemodule.interfaces import IZCMLFile, ITextFile
+from zope.app.apidoc.codemodule.module import Module
+from zope.app.apidoc.typemodule.type import TypeInterface
+from zope.app.apidoc.utilitymodule.utilitymodule import Utility
+from zope.app.apidoc.zcmlmodule import Directive
+
+
+def _signature(obj):
+    try:
+        return getFunctionSignature(obj)
+    except TypeError:
+        return None
+
+
+def getModuleRecord(module):
+    return {'type': 'module',
+            'path': module.getPath(),
+            'doc': module.getDocString(),
+            'package': module.isPackage()}
+
+
+def _basePath(base):
+    # Classes documented from the source code know their bases by path only.
+    if isinstance(base, basestring):
+        return base
+    return getPythonPath(base)
+
+
+def getClassRecord(klass):
+    permissions = getPermissionTable(klass.getSecurityChecker())
+    def info(name, iface):
+        info = {'name': name,
+                'interface': iface and getPythonPath(iface) or None}
+        info.update(permissions.getPermissionIds(name))
+        return info
+
+    attributes = []
+    for name, attr, iface in klass.getAttributes():
+        attributes.append(info(name, iface))
+    methods = []
+    for name, attr, iface in klass.getMethods():
+        method = info(name, iface)
+        if IFunctionDocumentation.providedBy(attr):
+            method['signature'] = attr.getSignature()
+        else:
+            method['signature'] = _signature(attr)
+        methods.append(method)
+
+    return {'type': 'class',
+            'path': klass.getPath(),
+            'doc': klass.getDocString(),
+            'bases': [_basePath(base) for base in klass.getBases()],
+            'interfaces': [getPythonPath(iface)
+                           for iface in klass.getInterfaces()],
+            'attributes': attributes,
+            'methods': methods}
+
+
+def getFunctionRecord(function):
+    return {'type': 'function',
+            'path': function.getPath(),
+            'doc': function.getDocString(),
+            'signature': function.getSignature()}
+
+
+def getFileRecord(file):
+    if IZCMLFile.providedBy(file):
+        type, filename = 'zcml', file.filename
+    else:
+        type, filename = 'text', file.path
+    return {'type': type,
+            'path': file.__parent__.getPath() + '.' + file.__name__,
+            'file': filename}
+
+
+def getInterfaceRecord(iface):
+    iface = removeAllProxies(iface)
+    attributes = []
+    methods = []
+    for name, desc in iface.namesAndDescriptions(True):
+        if hasattr(desc, 'getSignatureString'):
+            methods.append({'name': name,
+                            'signature': desc.getSignatureString()})
+        else:
+            attributes.append(name)
+    return {'type': 'interface',
+            'path': getPythonPath(iface),
+            'doc': iface.getDoc(),
+            'bases': [getPythonPath(base) for base in iface.__bases__],
+            'attributes': sorted(attributes),
+            'methods': sorted(methods, key=lambda method: method['name']),
+            'adapters': {
+                'required': [component.getAdapterInfoDictionary(reg)
+                             for reg in component.getRequiredAdapters(iface)],
+                'provided': [component.getAdapterInfoDictionary(reg)
+                             for reg in component.getProvidedAdapters(iface)],
+                }}
+
+
+def getUtilityRecord(utility):
+    info = component.getUtilityInfoDictionary(utility.registration)
+    return {'type': 'utility',
+            'path': info['path'],
+            'interface': info['iface_id'],
+            'name': utility.name}
+
+
+def getTypeRecord(type):
+    iface = removeAllProxies(type.interface)
+    return {'type': 'type',
+            'path': getPythonPath(iface),
+            'members': [name for name, member in type.items()]}
+
+
+def getDirectiveRecord(directive):
+    return {'type': 'directive',
+            'path': getPythonPath(directive.handler),
+            'namespace': directive.__parent__.getFullName(),
+            'name': directive.__name__,
+            'schema': getPythonPath(directive.schema),
+            'subdirectives': sorted([name for ns, name, schema, handler, info
+                                     in directive.subdirs])}
+
+
+def getTopicRecord(topic):
+    return {'type': 'topic',
+            'path': topic.getTopicPath(),
+            'title': topic.title}
+
+
+def getRecord(obj):
+    """Return the record of a documented object, or `None` if the object is
+    not supported."""
+    if IModuleDocumentation.providedBy(obj):
+        return getModuleRecord(obj)
+    if IClassDocumentation.providedBy(obj):
+        return getClassRecord(obj)
+    if IFunctionDocumentation.providedBy(obj):
+        return getFunctionRecord(obj)
+    if IZCMLFile.providedBy(obj) or ITextFile.providedBy(obj):
+        return getFileRecord(obj)
+    if IInterface.providedBy(removeAllProxies(obj)):
+        return getInterfaceRecord(obj)
+    if isinstance(obj, Utility):
+        return getUtilityRecord(obj)
+    if isinstance(obj, TypeInterface):
+        return getTypeRecord(obj)
+    if isinstance(obj, Directive):
+        return getDirectiveRecord(obj)
+    if IOnlineHelpTopic.providedBy(obj):
+        return getTopicRecord(obj)
+    return None
+
+
+# The last name of dotted paths that may be looked up in the interface module
+_interfaceName = re.compile(r'I[A-Z][A-Za-z0-9_]*$')
+
+
+def resolve(apidoc, path, nodes=None):
+    """Return the documentation of the object with a dotted path.
+
+    The objects are traversed in the code module. Interfaces that are not
+    found there are looked up with the interface module, which may import
+    the module of the interface; so only paths whose last name looks like
+    the name of an interface are looked up there. `nodes` can be a
+    dictionary, in which the traversed nodes are remembered by path, so that
+    the lookup of many objects in the same modules only traverses every
+    module once. `None` is returned, if the path cannot be resolved.
+    """
+    if nodes is None:
+        nodes = {}
+    node = apidoc.get('Code')
+    names = path.split('.')
+    for i in range(len(names)):
+        if node is None:
+            break
+        prefix = '.'.join(names[:i+1])
+        if prefix in nodes:
+            node = nodes[prefix]
+            continue
+        get = getattr(node, 'get', None)
+        if get is None:
+            node = None
+            break
+        node = nodes[prefix] = get(names[i])
+    if node is not None:
+        return node
+
+    interfaces = apidoc.get('Interface')
+    if interfaces is not None and len(names) > 1 and \
+           _interfaceName.match(names[-1]):
+        iface = interfaces.get(path)
+        if iface is not None and IInterface.providedBy(removeAllProxies(iface)):
+            return iface
+    return None
+
+
+def lookup(apidoc, paths):
+    """Return a dictionary from dotted paths to the records of the objects.
+
+    The record is `None` for paths that cannot be resolved or whose objects
+    are not supported. Paths that are not strings are skipped.
+    """
+    nodes = {}
+    records = {}
+    for path in paths:
+        if not isinstance(path, basestring) or path in records:
+            continue
+        obj = resolve(apidoc, path, nodes)
+        records[path] = obj is not None and getRecord(obj) or None
+    return records
+
+
+def matches(path, roots):
+    """Check whether a dotted path is in one of the root packages."""
+    if not roots:
+        return True
+    for root in roots:
+        if path == root or path.startswith(root + '.'):
+            return True
+    return False
+
+
+def _isAncestor(path, roots):
+    for root in roots:
+        if root.startswith(path + '.'):
+            return True
+    return False
+
+
+def _items(node):
+    if isinstance(node, Module):
+        # Modules that are not set up yet are not kept set up.
+        return node.walkItems()
+    return node.items()
+
+
+def walk(node, roots=None):
+    """Generate the records of all objects below a node.
+
+    If `roots` is given, only the objects whose path is inside of one of the
+    root packages are exported. In lazy mode, the modules that are not set up
+    yet are walked without setting them up, so that the walked part of the
+    tree is released again.
+    """
+    for name, obj in _items(node):
+        if IModuleDocumentation.providedBy(obj) and roots:
+            path = obj.getPath()
+            if not matches(path, roots):
+                # Only descend into packages that contain a root package.
+                if _isAncestor(path, roots):
+                    for record in walk(obj, roots):
+                        yield record
+                continue
+
+        record = getRecord(obj)
+        if record is not None and matches(record['path'] or '', roots):
+            yield record
+
+        if IReadContainer.providedBy(obj) and \
+               not isinstance(obj, TypeInterface):
+            for record in walk(obj, roots):
+                yield record
+
+
+def export(apidoc, modules=None, roots=None):
+    """Generate the JSON lines of the documentation.
+
+    The `modules` are the names of the documentation modules to export; by
+    default all modules are exported. Every record carries the name of its
+    documentation module.
+    """
+    for name, module in apidoc.items():
+        if modules and name not in modules:
+            continue
+        for record in walk(module, roots):
+            record['module'] = name
+            yield json.dumps(record, default=unicode) + '\n'
+
+
+###############################################################################
+# Command-line UI
+
+parser = optparse.OptionParser("%prog [options] SITE_ZCML")
+
+parser.add_option(
+    '--module', '-m', action="append", dest='modules',
+    help="""\
+The name of a documentation module to export, for example `Code` or
+`Interface`. Can be given several times; by default all modules are exported.
+""")
+
+parser.add_option(
+    '--root', '-r', action="append", dest='roots',
+    help="""\
+Only export objects of this Python package. Can be given several times.
+""")
+
+parser.add_option(
+    '--output', '-o', action="store", dest='output',
+    help="""\
+The file the records are written to; by default they are written to the
+standard output.
+""")
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    options, positional = parser.parse_args(args)
+    if len(positional) != 1:
+        parser.error("No site configuration file specified.")
+
+    import zope.app.appsetup.appsetup
+    from zope.app.apidoc.apidoc import APIDocumentation
+    zope.app.appsetup.appsetup.config(positional[0], features=('devmode',))
+
+    output = sys.stdout
+    if options.output:
+        output = open(options.output, 'w')
+    try:
+        apidoc = APIDocumentation(None, '++apidoc++')
+        for line in export(apidoc, options.modules, options.roots):
+            output.write(line)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Generations of the documented registries
+
+The documentation modules cache results that are computed from the component
+registries, the class registry and the tree of the code browser. Every one of
+those sources has a generation, which changes whenever the source changes, so
+that a cached result is validated by comparing its generation with the
+current one.
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+import time
+import threading
+
+from zope.component import adapter, getGlobalSiteManager
+from zope.component.interfaces import IRegistrationEvent
+from zope.component.registry import UtilityRegistration
+from zope.interface.interfaces import IInterface
+
+# The sources that have a generation. The generation of the interfaces only
+# changes, if an interface utility is (un)registered. Security checkers do not
+# tell about changes, so code that changes the permission of an already
+# protected name has to start a new generation of the checkers itself.
+COMPONENTS = 'components'
+INTERFACES = 'interfaces'
+CLASSES = 'classes'
+CODE = 'code'
+CHECKERS = 'checkers'
+
+_lock = threading.Lock()
+_counters = {COMPONENTS: 0, INTERFACES: 0, CLASSES: 0, CODE: 0, CHECKERS: 0}
+
+# Whether `registrationChanged()` has seen a registration event, i.e. whether
+# it is registered as event handler.
+_events = [False]
+
+# The generations of all sources and the time they were first seen.
+_seen = [None, time.time()]
+
+
+def bump(source=COMPONENTS):
+    """Start a new generation of a source and return it."""
+    _lock.acquire()
+    try:
+        _counters[source] += 1
+        return _counters[source]
+    finally:
+        _lock.release()
+
+
+def _getChangeCounter(registry):
+    """Return the change counter of an adapter registry or `None`.
+
+    The counter is a private attribute of `zope.interface`, so it is only
+    used if it is there and an integer.
+    """
+    counter = getattr(registry, '_generation', None)
+    if isinstance(counter, (int, long)):
+        return counter
+    return None
+
+
+def getGeneration(source=COMPONENTS):
+    """Return the current generation of a source.
+
+    The generations of the components and the interfaces are counted by
+    `registrationChanged()`. As long as it has not seen any event, they also
+    include the change counters of the global registries, so that they change
+    with the registrations, even if the handler is not registered.
+    """
+    if source not in (COMPONENTS, INTERFACES) or _events[0]:
+        return _counters[source]
+    gsm = getGlobalSiteManager()
+    if source == INTERFACES:
+        return (_counters[source], _getChangeCounter(gsm.utilities))
+    return (_counters[source], _getChangeCounter(gsm.adapters),
+            _getChangeCounter(gsm.utilities))
+
+
+def getLastModified():
+    """Return the time at which the generations were first seen to change.
+
+    Since the change is noticed when this function is called, the time is
+    never earlier than the actual change.
+    """
+    current = (getGeneration(COMPONENTS), _counters[CLASSES], _counters[CODE])
+    if current != _seen[0]:
+        _seen[:] = [current, time.time()]
+    return _seen[1]
+
+
+@adapter(IRegistrationEvent)
+def registrationChanged(event):
+    """Start a new generation of the components, if a component changed.
+
+    A new generation of the interfaces is only started, if an interface
+    utility was (un)registered.
+    """
+    _events[0] = True
+    bump(COMPONENTS)
+    reg = event.object
+    if isinstance(reg, UtilityRegistration) and \
+           reg.provided.isOrExtends(IInterface):
+        bump(INTERFACES)
+
+
+def cleanUp():
+    # Registries that are set up again may start with the same change
+    # counters, so all caches have to be invalidated explicitly.
+    for source in _counters.keys():
+        bump(source)
+    _events[0] = False
+
+from zope.testing.cleanup import addCleanUp
+addCleanUp(cleanUp)
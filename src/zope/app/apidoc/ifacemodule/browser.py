@@ -27,6 +27,8 @@ from zope.publisher.interfaces.xmlrpc import IXMLRPCRequest
 from zope.publisher.interfaces.http import IHTTPRequest
 from zope.publisher.interfaces.ftp import IFTPRequest
 from zope.publisher.browser import BrowserView
+from zope.schema import getFieldNamesInOrder
+from zope.app.preference.interfaces import IPreferenceGroup
 from zope.security.proxy import isinstance, removeSecurityProxy
 from zope.proxy import removeAllProxies
 from zope.traversing.api import getName, getParent, traverse
@@ -37,14 +39,23 @@ from zope.app.apidoc.apidoc import APIDocumentation
 from zope.app.apidoc import classregistry
 from zope.app.apidoc import interface, component, presentation
 from zope.app.apidoc.browser.utilities import findAPIDocumentationRootURL
+from zope.app.apidoc.browser.conditional import ConditionalView
+from zope.app.apidoc.browser.timing import TimedView
+from zope.app.apidoc.ifacemodule.interfaces import IInterfaceDetailsPreferences
 
-class InterfaceDetails(BrowserView):
+class InterfaceDetails(TimedView, ConditionalView, BrowserView):
     """View class for an Interface."""
 
     def __init__(self, context, request):
         super(InterfaceDetails, self).__init__(context, request)
         self._prepareViews()
 
+    def getCacheKey(self):
+        """The page depends on the interface details preferences."""
+        group = getUtility(IPreferenceGroup, 'apidoc.InterfaceDetails')
+        return [(name, getattr(group, name))
+                for name in getFieldNamesInOrder(IInterfaceDetailsPreferences)]
+
     def getAPIDocRootURL(self):
         return findAPIDocumentationRootURL(self.context, self.request)
 
@@ -22,6 +22,7 @@ $Id$
 """
 __docformat__ = 'restructuredtext'
 
+from zope.component import getSiteManager
 from zope.component.interface import queryInterface
 from zope.component.interface import searchInterfaceUtilities
 from zope.i18nmessageid import ZopeMessageFactory as _
@@ -29,9 +30,22 @@ from zope.interface import implements
 from zope.location import LocationProxy
 from zope.location.interfaces import ILocation
 
+from zope.app.apidoc.cache import GenerationalCache, registerCache
+from zope.app.apidoc.generation import INTERFACES, getGeneration
 from zope.app.apidoc.interfaces import IDocumentationModule
 from zope.app.apidoc.utilities import ReadContainerBase
 
+# Sorted lists of ``(name, interface)`` pairs, keyed by the site manager.
+# Both caches are only invalidated by (un)registrations of interfaces.
+_listings = registerCache('ifacemodule.listings',
+                          GenerationalCache(100, INTERFACES))
+
+# Dotted names that could not be resolved to an interface. Robots like to
+# request non-existent interface URLs, so we do not want to try importing them
+# over and over again.
+_notFound = registerCache('ifacemodule.notFound',
+                          GenerationalCache(1000, INTERFACES))
+
 class IInterfaceModule(IDocumentationModule):
     """Interface API Documentation Module
 
@@ -71,6 +85,9 @@ class InterfaceModule(ReadContainerBase):
         """See zope.app.interfaces.container.IReadContainer"""
         iface = queryInterface(key, default)
         if iface is default:
+            if key in _notFound:
+                return default
+            generation = getGeneration(INTERFACES)
             # Yeah, we find more items than we claim to have! This way we can
             # handle all interfaces using this module. :-)
             parts = key.split('.')
@@ -80,6 +97,8 @@ class InterfaceModule(ReadContainerBase):
                 iface = default
             else:
                 iface = getattr(mod, parts[-1], default)
+            if iface is default:
+                _notFound.set(key, True, generation)
 
         if not iface is default:
             iface = LocationProxy(iface, self, key)
@@ -88,7 +107,35 @@ class InterfaceModule(ReadContainerBase):
 
     def items(self):
         """See zope.app.interfaces.container.IReadContainer"""
-        items = list(searchInterfaceUtilities(self))
-        items.sort()
-        items = [(i[0], LocationProxy(i[1], self, i[0])) for i in items]
-        return items
+        listing = getInterfaceListing(self)
+        # The location proxies are only recreated, if the listing changed.
+        cached = getattr(self, '_v_items', None)
+        if cached is None or cached[0] is not listing:
+            items = [(name, LocationProxy(iface, self, name))
+                     for name, iface in listing]
+            cached = self._v_items = (listing, items)
+        return list(cached[1])
+
+
+def getInterfaceListing(context):
+    """Return the sorted ``(name, interface)`` pairs of all interfaces.
+
+    The listing is computed once per site manager and then served from a
+    cache, until an interface is registered or unregistered.
+    """
+    sm = getSiteManager(context)
+    listing = _listings.get(sm)
+    if listing is None:
+        generation = getGeneration(INTERFACES)
+        listing = list(searchInterfaceUtilities(context))
+        listing.sort()
+        _listings.set(sm, listing, generation)
+    return listing
+
+
+def _clear():
+    _listings.clear()
+    _notFound.clear()
+
+from zope.testing.cleanup import addCleanUp
+addCleanUp(_clear)
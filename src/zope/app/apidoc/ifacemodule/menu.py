@@ -19,6 +19,8 @@ __docformat__ = 'restructuredtext'
 from zope.security.proxy import removeSecurityProxy
 import re
 
+from zope.app.apidoc.browser.timing import TimedView
+
 whitepattern = re.compile('\s{2,}')
 def getAllTextOfInterface(iface):
     """Get all searchable text from an interface"""
@@ -31,7 +33,7 @@ def getAllTextOfInterface(iface):
     return text
 
 
-class Menu(object):
+class Menu(TimedView):
     """Menu for the Interface Documentation Module."""
 
     def findInterfaces(self):
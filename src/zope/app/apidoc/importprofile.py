@@ -0,0 +1,146 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Profile of the cost of importing and documenting modules
+
+When enabled, `classregistry.safe_import()` and the setup of the code
+browser's modules record the time, the memory and the number of children per
+module. The measured values include the cost of nested imports and sub-modules.
+The memory is only measured on systems with ``/proc``; elsewhere it is `None`.
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+import time
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+from zope.app.apidoc.process import getMemoryUsage
+
+
+def _add(total, value):
+    # Memory that could not be measured once is unknown for good.
+    if total is None or value is None:
+        return None
+    return total + value
+
+
+class ImportRecord(object):
+    """The cost of importing and documenting a module."""
+
+    def __init__(self, path):
+        self.path = path
+        self.importTime = 0.0
+        self.importMemory = 0
+        self.setupTime = 0.0
+        self.setupMemory = 0
+        self.children = 0
+
+    def time(self):
+        return self.importTime + self.setupTime
+    time = property(time)
+
+    def memory(self):
+        if self.importMemory is None or self.setupMemory is None:
+            return None
+        return self.importMemory + self.setupMemory
+    memory = property(memory)
+
+    def asDict(self):
+        return {'path': self.path,
+                'importTime': self.importTime,
+                'importMemory': self.importMemory,
+                'setupTime': self.setupTime,
+                'setupMemory': self.setupMemory,
+                'children': self.children}
+
+
+# The attributes the records can be sorted by.
+SORT_KEYS = ('time', 'memory', 'importTime', 'setupTime', 'children', 'path')
+
+
+class ImportProfile(object):
+    """Records of the import and setup cost of modules."""
+
+    def __init__(self):
+        self.enabled = False
+        self.records = {}
+
+    def start(self):
+        """Return a marker for the start of a measurement."""
+        return time.time(), getMemoryUsage()
+
+    def stop(self, kind, path, started, children=None):
+        """Record a measurement, where `kind` is 'import' or 'setup'."""
+        start, memory = started
+        duration = time.time() - start
+        if memory is not None:
+            memory = getMemoryUsage() - memory
+        record = self.records.get(path)
+        if record is None:
+            record = self.records[path] = ImportRecord(path)
+        if kind == 'import':
+            record.importTime += duration
+            record.importMemory = _add(record.importMemory, memory)
+        else:
+            record.setupTime += duration
+            record.setupMemory = _add(record.setupMemory, memory)
+        if children is not None:
+            record.children = children
+
+    def getRecords(self, sort='time'):
+        """Return the records, the most expensive first.
+
+        Records sorted by path are returned in alphabetical order.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError("Cannot sort by %r" % sort)
+        records = self.records.values()
+        records.sort(key=lambda record: getattr(record, sort),
+                     reverse=(sort != 'path'))
+        return records
+
+    def formatText(self, sort='time', limit=None):
+        """Return a report as plain text table."""
+        lines = ['%-50s %10s %10s %10s %8s' % (
+            'Module', 'Import (s)', 'Setup (s)', 'Memory (K)', 'Children')]
+        for record in self.getRecords(sort)[:limit]:
+            memory = record.memory
+            if memory is None:
+                memory = 'n/a'
+            lines.append('%-50s %10.3f %10.3f %10s %8i' % (
+                record.path, record.importTime, record.setupTime,
+                memory, record.children))
+        return '\n'.join(lines)
+
+    def toJSON(self, sort='time'):
+        """Return a report in JSON format."""
+        return json.dumps(
+            [record.asDict() for record in self.getRecords(sort)])
+
+    def clear(self):
+        self.records.clear()
+
+
+importProfile = ImportProfile()
+
+def cleanUp():
+    importProfile.enabled = False
+    importProfile.clear()
+
+# Make sure that the profile is reset after each test.
+from zope.testing.cleanup import addCleanUp
+addCleanUp(cleanUp)
@@ -0,0 +1,279 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Memory footprint of the documentation
+
+The structures the documentation keeps in memory -- the code tree, the class
+registry, the ZCML catalogs and the caches -- are walked and their retained
+size is estimated with `sys.getsizeof()`. Modules, classes, functions,
+interfaces, component registries and persistent objects are shared with the
+rest of the program, so they are not counted.
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+import sys
+import types
+import optparse
+from collections import deque
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+try:
+    import tracemalloc
+except ImportError:
+    # Only available in newer Python versions.
+    tracemalloc = None
+
+from persistent import Persistent
+from zope.component.registry import Components
+from zope.component.registry import AdapterRegistration, UtilityRegistration
+from zope.component.registry import HandlerRegistration
+from zope.component.registry import SubscriptionRegistration
+from zope.interface.adapter import BaseAdapterRegistry
+from zope.interface.interface import Specification
+from zope.proxy import removeAllProxies
+from zope.security.proxy import Proxy
+
+from zope.app.apidoc import zcmlmodule
+from zope.app.apidoc.cache import getCaches
+from zope.app.apidoc.classregistry import classRegistry
+from zope.app.apidoc.codemodule.codemodule import CodeModule
+
+# Objects that are shared with the rest of the program. The registrations
+# refer to the registered components, which are owned by the registries.
+SHARED_TYPES = (types.ModuleType, type, types.ClassType, types.FunctionType,
+                types.BuiltinFunctionType, types.MethodType, Specification,
+                Components, BaseAdapterRegistry, AdapterRegistration,
+                UtilityRegistration, HandlerRegistration,
+                SubscriptionRegistration, Persistent, Proxy)
+
+# Attributes that refer to objects outside of the walked structure.
+SKIPPED_ATTRIBUTES = ('__parent__',)
+
+CATEGORIES = ('codeTree', 'classRegistry', 'zcml', 'caches')
+
+
+def getSize(obj, seen=None):
+    """Estimate the memory retained by an object in bytes.
+
+    Objects whose ids are in the `seen` set are not counted again, so that
+    a set shared by several calls counts every object only once.
+    """
+    if seen is None:
+        seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, SHARED_TYPES):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        attrs = getattr(obj, '__dict__', None)
+        if isinstance(attrs, dict) and id(attrs) not in seen:
+            seen.add(id(attrs))
+            size += sys.getsizeof(attrs)
+            stack.extend([value for name, value in attrs.items()
+                          if name not in SKIPPED_ATTRIBUTES])
+    return size
+
+
+def getCacheSize(cache, seen=None):
+    """Estimate the memory retained by the values of a cache in bytes.
+
+    The keys are not followed, since they are often site managers or other
+    objects that are owned by the rest of the program.
+    """
+    if seen is None:
+        seen = set()
+    size = sys.getsizeof(cache)
+    for value in cache.values():
+        size += getSize(value, seen)
+    return size
+
+
+def _rootPackage(path):
+    return path.split('.')[0]
+
+
+def getReport(apidoc):
+    """Return the retained sizes by category and item.
+
+    The items of the code tree and the class registry are the root packages,
+    the items of the ZCML catalogs are the namespaces and the items of the
+    caches are the names of the caches. Objects that are reachable from
+    several items are only counted for the first one.
+    """
+    seen = set()
+    items = dict([(category, {}) for category in CATEGORIES])
+
+    code = removeAllProxies(apidoc.get('Code'))
+    # Only report a code tree that is set up; the report must not build it.
+    if isinstance(code, CodeModule) and code.lastRebuild is not None:
+        for name, module in code.items():
+            items['codeTree'][name] = getSize(removeAllProxies(module), seen)
+
+    registry = items['classRegistry']
+    for path in classRegistry.keys():
+        root = _rootPackage(path)
+        registry[root] = registry.get(root, 0) + getSize(path, seen)
+
+    namespaces = zcmlmodule.namespaces or {}
+    for namespace, directives in namespaces.items():
+        items['zcml'][namespace] = getSize((namespace, directives), seen)
+    subdirs = zcmlmodule.subdirs or {}
+    for key, value in subdirs.items():
+        namespace = key[0]
+        items['zcml'][namespace] = (items['zcml'].get(namespace, 0) +
+                                    getSize((key, value), seen))
+
+    for name, cache in getCaches():
+        items['caches'][name] = getCacheSize(cache, seen)
+
+    categories = {}
+    for category in CATEGORIES:
+        categories[category] = {'total': sum(items[category].values()),
+                                'items': items[category]}
+    # The containers of the class registry and the ZCML catalogs.
+    categories['classRegistry']['total'] += sys.getsizeof(classRegistry)
+    categories['zcml']['total'] += (sys.getsizeof(namespaces) +
+                                    sys.getsizeof(subdirs))
+    return {'total': sum([info['total'] for info in categories.values()]),
+            'categories': categories}
+
+
+def measureSetup(limit=10):
+    """Measure the memory allocated by the setup of a new code tree.
+
+    The allocations are traced with `tracemalloc` and the files that
+    allocated the most memory are returned as well. Note that the setup
+    imports the documented modules and registers their classes. `None` is
+    returned, if `tracemalloc` is not available.
+    """
+    if tracemalloc is None:
+        return None
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        code = CodeModule()
+        code.setup()
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started:
+            tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    return {'size': sum([stat.size_diff for stat in stats]),
+            'nodes': code.countNodes(),
+            'top': [{'file': str(stat.traceback), 'size': stat.size_diff}
+                    for stat in stats[:limit]]}
+
+
+def formatText(report, limit=None):
+    """Return a report as plain text table."""
+    lines = ['%-50s %12s' % ('Category / Item', 'Size (K)')]
+    for category in CATEGORIES:
+        info = report['categories'][category]
+        lines.append('%-50s %12i' % (category, info['total'] // 1024))
+        sizes = [(size, name) for name, size in info['items'].items()]
+        sizes.sort()
+        sizes.reverse()
+        for size, name in sizes[:limit]:
+            lines.append('  %-48s %12i' % (name[-48:], size // 1024))
+    lines.append('%-50s %12i' % ('total', report['total'] // 1024))
+    setup = report.get('setup')
+    if setup is not None:
+        lines.append('')
+        lines.append('%-50s %12i' % ('CodeModule.setup() (traced)',
+                                     setup['size'] // 1024))
+        for stat in setup['top']:
+            lines.append('  %-48s %12i' % (stat['file'][-48:],
+                                           stat['size'] // 1024))
+    return '\n'.join(lines)
+
+
+###############################################################################
+# Command-line UI
+
+parser = optparse.OptionParser("%prog [options] SITE_ZCML")
+
+parser.add_option(
+    '--json', action="store_true", dest='json', default=False,
+    help="Write the report in JSON format.")
+
+parser.add_option(
+    '--limit', '-l', action="store", type="int", dest='limit', default=10,
+    help="The number of items listed per category (default: 10).")
+
+parser.add_option(
+    '--tracemalloc', '-t', action="store_true", dest='tracemalloc',
+    default=False,
+    help="""\
+Also trace the memory allocated by the setup of a new code tree. This requires
+a Python version that provides the `tracemalloc` module.
+""")
+
+parser.add_option(
+    '--output', '-o', action="store", dest='output',
+    help="""\
+The file the report is written to; by default it is written to the standard
+output.
+""")
+
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+    options, positional = parser.parse_args(args)
+    if len(positional) != 1:
+        parser.error("No site configuration file specified.")
+    if options.tracemalloc and tracemalloc is None:
+        parser.error("The tracemalloc module is not available.")
+
+    import zope.app.appsetup.appsetup
+    from zope.app.apidoc.apidoc import APIDocumentation
+    zope.app.appsetup.appsetup.config(positional[0], features=('devmode',))
+
+    apidoc = APIDocumentation(None, '++apidoc++')
+    # The report does not set up the code tree, but a new process has none.
+    code = apidoc.get('Code')
+    if code is not None:
+        code.setup()
+    report = getReport(apidoc)
+    if options.tracemalloc:
+        report['setup'] = measureSetup(options.limit)
+
+    output = sys.stdout
+    if options.output:
+        output = open(options.output, 'w')
+    try:
+        if options.json:
+            json.dump(report, output, indent=2, sort_keys=True)
+        else:
+            output.write(formatText(report, options.limit))
+        output.write('\n')
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == '__main__':
+    main()
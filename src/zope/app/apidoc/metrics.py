@@ -0,0 +1,118 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Metrics of the caches and indexes of the documentation
+
+The metrics are collected into a dictionary, which can be serialized as JSON,
+or formatted in the text format of Prometheus.
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+from zope.proxy import removeAllProxies
+
+from zope.app.apidoc import generation
+from zope.app.apidoc.cache import getCaches
+from zope.app.apidoc.classregistry import classRegistry
+from zope.app.apidoc.codemodule import discovery
+from zope.app.apidoc.codemodule.codemodule import CodeModule
+from zope.app.apidoc.typemodule import type as typemodule
+
+PREFIX = 'apidoc_'
+
+
+def getMetrics(apidoc):
+    """Return the metrics of the documentation."""
+    types = typemodule.getStatistics()
+    files = discovery.getStatistics()
+    metrics = {
+        'caches': dict([(name, cache.getStatistics())
+                        for name, cache in getCaches()]),
+        'indexes': {'typeIndex.types': types['types'],
+                    'typeIndex.members': types['members'],
+                    'discovery.listings': files['listings'],
+                    'discovery.archives': files['archives']},
+        'classRegistry': len(classRegistry),
+        'codeNodes': 0,
+        'codeSetupDuration': None,
+        'codeLastRebuild': None,
+        'generationLastChange': generation.getLastModified(),
+        }
+    code = removeAllProxies(apidoc.get('Code'))
+    if isinstance(code, CodeModule):
+        metrics['codeNodes'] = code.countNodes()
+        metrics['codeSetupDuration'] = code.setupDuration
+        metrics['codeLastRebuild'] = code.lastRebuild
+    return metrics
+
+
+def _formatValue(value):
+    if isinstance(value, (int, long)):
+        return str(value)
+    return repr(float(value))
+
+
+def _formatLabels(labels):
+    if not labels:
+        return ''
+    return '{%s}' % ','.join(
+        ['%s="%s"' % (name, value.replace('\\', '\\\\').replace('"', '\\"'))
+         for name, value in labels])
+
+
+def formatPrometheus(metrics):
+    """Format the metrics in the text format of Prometheus."""
+    lines = []
+    def add(name, type, help, samples):
+        samples = [(labels, value) for labels, value in samples
+                   if value is not None]
+        if not samples:
+            return
+        lines.append('# HELP %s%s %s' % (PREFIX, name, help))
+        lines.append('# TYPE %s%s %s' % (PREFIX, name, type))
+        for labels, value in samples:
+            lines.append('%s%s%s %s' % (PREFIX, name, _formatLabels(labels),
+                                        _formatValue(value)))
+
+    caches = sorted(metrics['caches'].items())
+    def cacheSamples(key):
+        return [((('cache', name),), stats[key]) for name, stats in caches]
+
+    add('cache_hits_total', 'counter',
+        'Lookups that found an entry in the cache.', cacheSamples('hits'))
+    add('cache_misses_total', 'counter',
+        'Lookups that found no entry in the cache.', cacheSamples('misses'))
+    add('cache_evictions_total', 'counter',
+        'Entries evicted from the full cache.', cacheSamples('evictions'))
+    add('cache_entries', 'gauge',
+        'Entries in the cache.', cacheSamples('size'))
+    add('cache_max_entries', 'gauge',
+        'Maximum number of entries in the cache.', cacheSamples('maxsize'))
+    add('index_entries', 'gauge', 'Entries in the index.',
+        [((('index', name),), value)
+         for name, value in sorted(metrics['indexes'].items())])
+    add('class_registry_classes', 'gauge',
+        'Classes in the class registry.', [((), metrics['classRegistry'])])
+    add('code_nodes', 'gauge',
+        'Nodes of the code tree that are set up.',
+        [((), metrics['codeNodes'])])
+    add('code_setup_duration_seconds', 'gauge',
+        'Duration of the setup of the code tree.',
+        [((), metrics['codeSetupDuration'])])
+    add('code_last_rebuild_timestamp_seconds', 'gauge',
+        'Time the code tree was last built or refreshed.',
+        [((), metrics['codeLastRebuild'])])
+    add('generation_last_change_timestamp_seconds', 'gauge',
+        'Time the registries were last seen to change.',
+        [((), metrics['generationLastChange'])])
+    return '\n'.join(lines) + '\n'
@@ -23,9 +23,10 @@ from zope.interface import Interface
 from zope.i18nmessageid import ZopeMessageFactory as _
 from zope.app.apidoc.utilities import getPythonPath, relativizePath
 from zope.app.apidoc.utilities import getPermissionIds
+from zope.app.apidoc.cache import GenerationalCache, registerCache
+from zope.app.apidoc.component import cached
 from zope.app.apidoc.component import getParserInfoInfoDictionary
 from zope.app.apidoc.component import getInterfaceInfoDictionary
-from zope.app.publisher.browser.icon import IconViewFactory
 
 from zope.publisher.interfaces import IRequest
 from zope.publisher.interfaces.browser import IBrowserRequest
@@ -42,6 +43,10 @@ BROWSER_DIRECTIVES_MODULE = 'zope.app.publisher.browser.viewmeta'
 XMLRPC_DIRECTIVES_MODULE = 'zope.app.publisher.xmlrpc.metaconfigure'
 JSONRPC_DIRECTIVES_MODULE = 'jsonserver.metaconfigure'
 
+# The view registrations found for interfaces, keyed by the interface and the
+# request type.
+_views = registerCache('presentation.views', GenerationalCache(1000))
+
 def getViewFactoryData(factory):
     """Squeeze some useful information out of the view factory"""
     info = {'path': None, 'url': None, 'template': None, 'resource': None,
@@ -103,6 +108,8 @@ def getViewFactoryData(factory):
     if info['referencable']:
         info['url'] = info['path'].replace('.', '/')
 
+    # Imported here, since the browser publisher is expensive to import.
+    from zope.app.publisher.browser.icon import IconViewFactory
     if isinstance(factory, IconViewFactory):
         info['resource'] = factory.rname
 
@@ -122,6 +129,10 @@ def getPresentationType(iface):
 
 def getViews(iface, type=IRequest):
     """Get all view registrations for a particular interface."""
+    return cached(_views, _getViews, iface, type)
+
+
+def _getViews(iface, type):
     gsm = getGlobalSiteManager()
     for reg in gsm.registeredAdapters():
         if (len(reg.required) > 0 and
@@ -180,3 +191,7 @@ def getViewInfoDictionary(reg):
     info.update(getPermissionIds('publishTraverse', klass=reg.factory))
 
     return info
+
+
+from zope.testing.cleanup import addCleanUp
+addCleanUp(_views.clear)
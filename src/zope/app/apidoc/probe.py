@@ -0,0 +1,161 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Probing the import of modules in separate processes
+
+When unknown modules are imported by the class registry, a single module
+that hangs or crashes while being imported blocks the entire documentation.
+The import probe imports the candidate modules in separate processes, in
+parallel and with a timeout, and records the modules that cannot be imported,
+so that `classregistry.safe_import()` never tries to import them.
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+import sys
+import time
+import multiprocessing
+
+import zope.component
+
+from zope.app.apidoc import classregistry
+from zope.app.apidoc.codemodule.interfaces import IAPIDocRootModule
+from zope.app.apidoc.codemodule.source import findModules
+
+# The default number of seconds a module may take to be imported.
+DEFAULT_TIMEOUT = 30
+
+# The number of seconds between checks of the running processes.
+POLL_INTERVAL = 0.05
+
+
+class ProbeResult(object):
+    """The result of probing the import of a module."""
+
+    def __init__(self, path, importable, duration, error=None):
+        self.path = path
+        self.importable = importable
+        self.duration = duration
+        self.error = error
+
+    def __repr__(self):
+        if self.importable:
+            return '<ProbeResult %s: importable>' % self.path
+        return '<ProbeResult %s: %s>' % (self.path, self.error)
+
+
+def _probe(path, connection):
+    """Import a module and send the error and duration to the parent."""
+    start = time.time()
+    error = None
+    try:
+        __import__(path)
+    except Exception, err:
+        error = '%s: %s' % (err.__class__.__name__, err)
+    connection.send((error, time.time()-start))
+    connection.close()
+
+
+def probeModules(paths, timeout=DEFAULT_TIMEOUT, processes=None):
+    """Import every module in a separate process.
+
+    At most `processes` modules are imported at the same time; the default is
+    the number of CPUs. Processes that take longer than `timeout` seconds are
+    terminated. A dictionary from the paths to `ProbeResult` objects is
+    returned.
+    """
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    pending = list(paths)
+    pending.reverse()
+    running = {}
+    results = {}
+    while pending or running:
+        while pending and len(running) < processes:
+            path = pending.pop()
+            receiver, sender = multiprocessing.Pipe(False)
+            process = multiprocessing.Process(target=_probe,
+                                              args=(path, sender))
+            process.daemon = True
+            process.start()
+            sender.close()
+            running[path] = (process, receiver, time.time())
+
+        for path, (process, receiver, started) in running.items():
+            duration = time.time() - started
+            # Check whether the process is alive before polling, so that a
+            # process that exits after sending its result is not lost.
+            alive = process.is_alive()
+            if receiver.poll():
+                try:
+                    error, duration = receiver.recv()
+                except EOFError:
+                    error = 'Process exited with code %s' % process.exitcode
+            elif not alive:
+                error = 'Process exited with code %s' % process.exitcode
+            elif duration > timeout:
+                process.terminate()
+                error = 'Timeout after %i seconds' % timeout
+            else:
+                continue
+            process.join()
+            receiver.close()
+            del running[path]
+            results[path] = ProbeResult(path, error is None, duration, error)
+
+        if running:
+            time.sleep(POLL_INTERVAL)
+    return results
+
+
+def recordResults(results):
+    """Record the modules that cannot be imported with the class registry."""
+    for path, result in results.items():
+        if result.importable:
+            classregistry.UNIMPORTABLE_MODULES.pop(path, None)
+        else:
+            classregistry.UNIMPORTABLE_MODULES[path] = result.error
+
+
+def findCandidates(rootModules=None):
+    """Return the paths of all modules of the root modules, which have not
+    been imported yet.
+
+    The root modules default to the ones registered for the code browser.
+    """
+    if rootModules is None:
+        rootModules = [str(name) for name, mod in
+                       zope.component.getUtilitiesFor(IAPIDocRootModule)]
+    # The list keeps the order, the set is used for the membership checks.
+    candidates = []
+    found = set()
+    for name in rootModules:
+        module = classregistry.safe_import(name)
+        for directory in getattr(module, '__path__', ()):
+            for path, filename in findModules(directory, name):
+                if path in sys.modules or path in found:
+                    continue
+                for exclude_name in classregistry.IGNORE_MODULES:
+                    if path.startswith(exclude_name):
+                        break
+                else:
+                    candidates.append(path)
+                    found.add(path)
+    return candidates
+
+
+def probeRootModules(timeout=DEFAULT_TIMEOUT, processes=None):
+    """Probe and record all modules of the code browser's root modules."""
+    results = probeModules(findCandidates(), timeout, processes)
+    recordResults(results)
+    return results
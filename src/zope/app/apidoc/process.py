@@ -0,0 +1,60 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Memory usage of the process
+
+All sizes are returned in kilobytes (KiB), whatever unit the system reports.
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+import os
+import sys
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_statm = '/proc/self/statm'
+
+
+def getMemoryUsage():
+    """Return the resident memory of the process in kilobytes.
+
+    `None` is returned on systems without ``/proc``. The peak resident size
+    is available there, but it does not decrease and thus cannot be used to
+    measure differences.
+    """
+    if os.path.exists(_statm):
+        file = open(_statm)
+        try:
+            pages = int(file.read().split()[1])
+        finally:
+            file.close()
+        return pages * (os.sysconf('SC_PAGE_SIZE') // 1024)
+    return None
+
+
+def getPeakMemoryUsage():
+    """Return the peak resident memory of the process in kilobytes.
+
+    `None` is returned, if the peak memory cannot be determined.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        # Mac OS X reports bytes, all other systems kilobytes.
+        peak //= 1024
+    return peak
@@ -17,38 +17,27 @@ $Id$
 """
 __docformat__ = "reStructuredText"
 
-import base64
 import os
 import os.path
 import sys
 import time
 import optparse
 import urllib2
+try:
+    import json
+except ImportError:
+    import simplejson as json
 import urlparse
 import warnings
 import HTMLParser
 
-import zope.testbrowser.testing
-import mechanize
-
-from zope.app.testing import functional
-
 from zope.app.apidoc import classregistry
+from zope.app.apidoc.process import getPeakMemoryUsage
 
 VERBOSITY_MAP = {1: 'ERROR', 2: 'WARNING', 3: 'INFO'}
 
-# A mapping of HTML elements that can contain links to the attribute that
-# actually contains the link
-urltags = {
-    "a": "href",
-    "area": "href",
-    "base": "href",
-    "frame": "src",
-    "iframe": "src",
-    "link": "href",
-    "img": "src",
-    "script": "src",
-}
+# The phases of the processing of a link, which are timed separately.
+PHASES = ('fetch', 'links', 'rewrite', 'write')
 
 def getMaxWidth():
     try:
@@ -61,7 +50,8 @@ def getMaxWidth():
             cols = curses.tigetnum('cols')
             if cols > 0:
                 return cols
-        except curses.error:
+        except (curses.error, TypeError):
+            # The output is not a terminal or not even a file.
             pass
     return 80
 
@@ -122,59 +112,11 @@ class Link(object):
         return False
 
 
-class OnlineBrowser(mechanize.Browser, object):
-
-    def __init__(self, factory=None, history=None, request_class=None):
-        if factory == None:
-            factory = ApiDocDefaultFactory()
-        mechanize.Browser.__init__(self, factory, history, request_class)
-
-    def setUserAndPassword(self, user, pw):
-        """Specify the username and password to use for the retrieval."""
-        hash = base64.encodestring(user+':'+pw).strip()
-        self.addheaders.append(('Authorization', 'Basic '+hash))
-
-    @property
-    def contents(self):
-        """Get the content of the returned data"""
-        response = self.response()
-        old_location = response.tell()
-        response.seek(0)
-        contents = response.read()
-        response.seek(old_location)
-        return contents
-
-
-class PublisherBrowser(zope.testbrowser.testing.PublisherMechanizeBrowser,
-                       object):
-
-    def __init__(self, *args, **kw):
-        functional.defineLayer(
-            'Functional',
-            zcml=os.path.abspath(os.path.join(os.path.dirname(__file__),
-                                              'ftesting.zcml')))
-        Functional.setUp()
-        super(PublisherBrowser, self).__init__(*args, **kw)
-
-    def setUserAndPassword(self, user, pw):
-        """Specify the username and password to use for the retrieval."""
-        self.addheaders.append(('Authorization', 'Basic %s:%s' %(user, pw)))
-
-    @property
-    def contents(self):
-        """Get the content of the returned data"""
-        response = self.response()
-        old_location = response.tell()
-        response.seek(0)
-        contents = response.read()
-        response.seek(old_location)
-        return contents
-
-
 class StaticAPIDocGenerator(object):
     """Static API doc Maker"""
 
     def __init__(self, options):
+        import mechanize
         self.options = options
         self.linkQueue = []
         for url in self.options.additional_urls + [self.options.startpage]:
@@ -194,6 +136,8 @@ class StaticAPIDocGenerator(object):
         self.counter = 0
         self.linkErrors = 0
         self.htmlErrors = 0
+        self.bytesWritten = 0
+        self.timings = dict([(phase, 0.0) for phase in PHASES])
 
         # Turn off deprecation warnings
         warnings.filterwarnings("ignore", category=DeprecationWarning)
@@ -201,11 +145,7 @@ class StaticAPIDocGenerator(object):
         if not os.path.exists(self.rootDir):
             os.mkdir(self.rootDir)
 
-        if self.options.use_webserver:
-            self.browser = OnlineBrowser()
-        elif self.options.use_publisher:
-            self.browser = PublisherBrowser()
-
+        self.browser = self.createBrowser()
         self.browser.setUserAndPassword(self.options.username,
                                         self.options.password)
 
@@ -216,6 +156,8 @@ class StaticAPIDocGenerator(object):
 
         if self.options.import_unknown_modules:
             classregistry.__import_unknown_modules__ = True
+            if self.options.probe_imports:
+                self.probeImports()
 
         # Work through all links until there are no more to work on.
         self.sendMessage('Starting retrieval.')
@@ -229,12 +171,63 @@ class StaticAPIDocGenerator(object):
                 self.processLink(link)
 
         t1 = time.time()
+        self.runTime = t1-t0
 
         self.sendMessage("Run time: %.3f sec" % (t1-t0))
         self.sendMessage("Links: %i" %self.counter)
         self.sendMessage("Link Retrieval Errors: %i" %self.linkErrors)
         self.sendMessage("HTML ParsingErrors: %i" %self.htmlErrors)
 
+        statistics = self.getStatistics()
+        self.sendMessage("Pages per second: %.1f" %statistics['pagesPerSecond'])
+        self.sendMessage("Bytes written: %i" %statistics['bytesWritten'])
+        if statistics['peakMemory'] is not None:
+            self.sendMessage("Peak memory: %i KB" %statistics['peakMemory'])
+        for phase in PHASES:
+            self.sendMessage("Time for %s: %.3f sec" %(
+                phase, statistics['timings'][phase]))
+        if self.options.statistics:
+            file = open(self.options.statistics, 'w')
+            try:
+                json.dump(statistics, file, indent=2, sort_keys=True)
+            finally:
+                file.close()
+
+    def createBrowser(self):
+        """Create the browser the pages are retrieved with."""
+        # Imported here, since the browsers are expensive to import.
+        from zope.app.apidoc.staticbrowser import OnlineBrowser
+        from zope.app.apidoc.staticbrowser import PublisherBrowser
+        if self.options.use_webserver:
+            return OnlineBrowser()
+        elif self.options.use_publisher:
+            return PublisherBrowser()
+
+    def getStatistics(self):
+        """Return the statistics of the retrieval."""
+        return {'pages': self.counter,
+                'runTime': self.runTime,
+                'pagesPerSecond': self.runTime and self.counter/self.runTime,
+                'bytesWritten': self.bytesWritten,
+                'peakMemory': getPeakMemoryUsage(),
+                'linkErrors': self.linkErrors,
+                'htmlErrors': self.htmlErrors,
+                'timings': dict(self.timings)}
+
+    def probeImports(self):
+        """Find the modules that cannot be imported, before importing any."""
+        from zope.app.apidoc import probe
+        self.sendMessage('Probing imports.')
+        results = probe.probeRootModules(self.options.probe_timeout,
+                                         self.options.probe_processes)
+        failed = [result for result in results.values()
+                  if not result.importable]
+        failed.sort(key=lambda result: result.path)
+        self.sendMessage('Probed Modules: %i' %len(results))
+        self.sendMessage('Unimportable Modules: %i' %len(failed))
+        for result in failed:
+            self.sendMessage('%s: %s' %(result.path, result.error), 2)
+
     def showProgress(self, link):
         self.counter += 1
         if self.options.progress:
@@ -254,14 +247,11 @@ class StaticAPIDocGenerator(object):
             sys.stdout.flush()
             self.needNewLine = False
 
-    def processLink(self, link):
-        """Process a link."""
-        url = link.absoluteURL
+    def fetch(self, link):
+        """Retrieve the content of a link.
 
-        # Whatever will happen, we have looked at the URL
-        self.visited.append(url)
-
-        # Retrieve the content
+        `None` is returned, if the link could not be retrieved at all.
+        """
         try:
             self.browser.open(link.callableURL)
         except urllib2.HTTPError, error:
@@ -278,32 +268,38 @@ class StaticAPIDocGenerator(object):
             self.linkErrors += 1
             self.sendMessage('Bad URL: ' + link.callableURL, 2)
             self.sendMessage('+-> Reference: ' + link.referenceURL, 2)
-            return
+            return None
         except Exception, error:
             # This should never happen outside the debug mode. We really want
             # to catch all exceptions, so that we can investigate them.
             if self.options.debug:
                 import pdb; pdb.set_trace()
-            return
+            return None
 
         # Get the response content
-        contents = self.browser.contents
+        return self.browser.contents
+
+    def processLink(self, link):
+        """Process a link."""
+        url = link.absoluteURL
+
+        # Whatever will happen, we have looked at the URL
+        self.visited.append(url)
+
+        # Retrieve the content
+        start = time.time()
+        contents = self.fetch(link)
+        self.timings['fetch'] += time.time() - start
+        if contents is None:
+            return
 
-        # Make sure the directory exists and get a file path.
         relativeURL = url.replace(self.options.url, '')
-        dir = self.rootDir
         segments = relativeURL.split('/')
         filename = segments.pop()
 
-        for segment in segments:
-            dir = os.path.join(dir, segment)
-            if not os.path.exists(dir):
-                os.mkdir(dir)
-
-        filepath = os.path.join(dir, filename)
-
         # Now retrieve all links
         if self.browser.viewing_html():
+            start = time.time()
 
             try:
                 links = self.browser.links()
@@ -316,7 +312,9 @@ class StaticAPIDocGenerator(object):
 
             links = [Link(mech_link, self.options.url, url)
                      for mech_link in links]
+            self.timings['links'] += time.time() - start
 
+            start = time.time()
             for link in links:
                 # Make sure we do not handle unwanted links.
                 if not (link.isLocalURL() and link.isApidocLink()):
@@ -330,75 +328,30 @@ class StaticAPIDocGenerator(object):
                 parts = ['..']*len(segments)
                 parts.append(link.absoluteURL.replace(self.options.url, ''))
                 contents = contents.replace(link.originalURL, '/'.join(parts))
+            self.timings['rewrite'] += time.time() - start
+
+        # Make sure the directory exists and get a file path.
+        start = time.time()
+        dir = self.rootDir
+        for segment in segments:
+            dir = os.path.join(dir, segment)
+            if not os.path.exists(dir):
+                os.mkdir(dir)
+
+        filepath = os.path.join(dir, filename)
 
         # Write the data into the file
         try:
             file = open(filepath, 'w')
             file.write(contents)
             file.close()
+            self.bytesWritten += len(contents)
         except IOError:
             # The file already exists, so it is a duplicate and a bad one,
             # since the URL misses `index.hml`. ReST can produce strange URLs
             # that produce this problem, and we have little control over it.
             pass
-
-class ApiDocDefaultFactory(mechanize._html.DefaultFactory):
-    """Based on sgmllib."""
-    def __init__(self, i_want_broken_xhtml_support=False):
-        mechanize._html.Factory.__init__(
-            self,
-            forms_factory=mechanize._html.FormsFactory(),
-            links_factory=ApiDocLinksFactory(urltags=urltags),
-            title_factory=mechanize._html.TitleFactory(),
-            response_type_finder=mechanize._html.ResponseTypeFinder(
-                allow_xhtml=i_want_broken_xhtml_support),
-            )
-
-
-class ApiDocLinksFactory(mechanize._html.LinksFactory):
-    """Copy of mechanize link factory.
-
-    Unfortunately, the original implementation explicitely ignores base hrefs.
-    """
-
-    def links(self):
-        """Return an iterator that provides links of the document."""
-        response = self._response
-        encoding = self._encoding
-        base_url = self._base_url
-        p = self.link_parser_class(response, encoding=encoding)
-
-        for token in p.tags(*(self.urltags.keys()+["base"])):
-            # NOTE: WE WANT THIS HERE NOT TO IGNORE IT!
-            #if token.data == "base":
-            #    base_url = dict(token.attrs).get("href")
-            #    continue
-            if token.type == "endtag":
-                continue
-            attrs = dict(token.attrs)
-            tag = token.data
-            name = attrs.get("name")
-            text = None
-            # XXX use attr_encoding for ref'd doc if that doc does not provide
-            #  one by other means
-            #attr_encoding = attrs.get("charset")
-            url = attrs.get(self.urltags[tag])  # XXX is "" a valid URL?
-            if not url:
-                # Probably an <A NAME="blah"> link or <AREA NOHREF...>.
-                # For our purposes a link is something with a URL, so ignore
-                # this.
-                continue
-
-            url = mechanize._rfc3986.clean_url(url, encoding)
-            if tag == "a":
-                if token.type != "startendtag":
-                    # hmm, this'd break if end tag is missing
-                    text = p.get_compressed_text(("endtag", tag))
-                # but this doesn't work for eg. <a href="blah"><b>Andy</b></a>
-                #text = p.get_compressed_text()
-
-            yield mechanize._html.Link(base_url, url, text, tag, token.attrs)
-
+        self.timings['write'] += time.time() - start
 
 ###############################################################################
 # Command-line UI
@@ -474,6 +427,28 @@ Retrieve all referenced modules, even if they have not been imported during
 the startup process.
 """)
 
+retrieval.add_option(
+    '--probe-imports', action="store_true", dest='probe_imports',
+    help="""\
+Together with `--load-all`, import all modules of the root modules in
+separate processes first. Modules that fail or hang will not be imported
+during retrieval. The results are only known to the generator process, so
+they do not apply to the server used with `--webserver`.
+""")
+
+retrieval.add_option(
+    '--probe-timeout', type="int", dest='probe_timeout',
+    help="""\
+The number of seconds a module may take to be imported by the import probe.
+""")
+
+retrieval.add_option(
+    '--probe-processes', type="int", dest='probe_processes',
+    help="""\
+The number of processes the import probe runs at the same time. The default
+is the number of CPUs.
+""")
+
 parser.add_option_group(retrieval)
 
 ######################################################################
@@ -494,6 +469,13 @@ reporting.add_option(
 Output progress status
 """)
 
+reporting.add_option(
+    '--statistics', action="store", dest='statistics',
+    help="""\
+Write the statistics of the retrieval, like the pages per second and the time
+spent in every phase, in JSON format into this file.
+""")
+
 reporting.add_option(
     '--debug', '-d', action="store_true", dest='debug',
     help="""\
@@ -523,7 +505,8 @@ default_setup_args = [
     '--add', '@@/tree_images/plus_vline.png',
     '--ignore', 'twisted',
     '--ignore', 'zope.app.twisted.ftp.test',
-    '--load-all'
+    '--load-all',
+    '--probe-timeout', '30',
     ]
 
 def merge_options(options, defaults):
@@ -0,0 +1,148 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Browsers used to retrieve the static API documentation
+
+They are kept apart from the `static` module, since `mechanize` and
+`zope.testbrowser` are expensive to import.
+
+$Id$
+"""
+__docformat__ = "reStructuredText"
+
+import base64
+import os
+
+import zope.testbrowser.testing
+import mechanize
+
+from zope.app.testing import functional
+
+# A mapping of HTML elements that can contain links to the attribute that
+# actually contains the link
+urltags = {
+    "a": "href",
+    "area": "href",
+    "base": "href",
+    "frame": "src",
+    "iframe": "src",
+    "link": "href",
+    "img": "src",
+    "script": "src",
+}
+
+class OnlineBrowser(mechanize.Browser, object):
+
+    def __init__(self, factory=None, history=None, request_class=None):
+        if factory == None:
+            factory = ApiDocDefaultFactory()
+        mechanize.Browser.__init__(self, factory, history, request_class)
+
+    def setUserAndPassword(self, user, pw):
+        """Specify the username and password to use for the retrieval."""
+        hash = base64.encodestring(user+':'+pw).strip()
+        self.addheaders.append(('Authorization', 'Basic '+hash))
+
+    @property
+    def contents(self):
+        """Get the content of the returned data"""
+        response = self.response()
+        old_location = response.tell()
+        response.seek(0)
+        contents = response.read()
+        response.seek(old_location)
+        return contents
+
+
+class PublisherBrowser(zope.testbrowser.testing.PublisherMechanizeBrowser,
+                       object):
+
+    def __init__(self, *args, **kw):
+        functional.defineLayer(
+            'Functional',
+            zcml=os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                              'ftesting.zcml')))
+        Functional.setUp()
+        super(PublisherBrowser, self).__init__(*args, **kw)
+
+    def setUserAndPassword(self, user, pw):
+        """Specify the username and password to use for the retrieval."""
+        self.addheaders.append(('Authorization', 'Basic %s:%s' %(user, pw)))
+
+    @property
+    def contents(self):
+        """Get the content of the returned data"""
+        response = self.response()
+        old_location = response.tell()
+        response.seek(0)
+        contents = response.read()
+        response.seek(old_location)
+        return contents
+
+
+class ApiDocDefaultFactory(mechanize._html.DefaultFactory):
+    """Based on sgmllib."""
+    def __init__(self, i_want_broken_xhtml_support=False):
+        mechanize._html.Factory.__init__(
+            self,
+            forms_factory=mechanize._html.FormsFactory(),
+            links_factory=ApiDocLinksFactory(urltags=urltags),
+            title_factory=mechanize._html.TitleFactory(),
+            response_type_finder=mechanize._html.ResponseTypeFinder(
+                allow_xhtml=i_want_broken_xhtml_support),
+            )
+
+
+class ApiDocLinksFactory(mechanize._html.LinksFactory):
+    """Copy of mechanize link factory.
+
+    Unfortunately, the original implementation explicitely ignores base hrefs.
+    """
+
+    def links(self):
+        """Return an iterator that provides links of the document."""
+        response = self._response
+        encoding = self._encoding
+        base_url = self._base_url
+        p = self.link_parser_class(response, encoding=encoding)
+
+        for token in p.tags(*(self.urltags.keys()+["base"])):
+            # NOTE: WE WANT THIS HERE NOT TO IGNORE IT!
+            #if token.data == "base":
+            #    base_url = dict(token.attrs).get("href")
+            #    continue
+            if token.type == "endtag":
+                continue
+            attrs = dict(token.attrs)
+            tag = token.data
+            name = attrs.get("name")
+            text = None
+            # XXX use attr_encoding for ref'd doc if that doc does not provide
+            #  one by other means
+            #attr_encoding = attrs.get("charset")
+            url = attrs.get(self.urltags[tag])  # XXX is "" a valid URL?
+            if not url:
+                # Probably an <A NAME="blah"> link or <AREA NOHREF...>.
+                # For our purposes a link is something with a URL, so ignore
+                # this.
+                continue
+
+            url = mechanize._rfc3986.clean_url(url, encoding)
+            if tag == "a":
+                if token.type != "startendtag":
+                    # hmm, this'd break if end tag is missing
+                    text = p.get_compressed_text(("endtag", tag))
+                # but this doesn't work for eg. <a href="blah"><b>Andy</b></a>
+                #text = p.get_compressed_text()
+
+            yield mechanize._html.Link(base_url, url, text, tag, token.attrs)
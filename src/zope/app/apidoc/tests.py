@@ -16,8 +16,11 @@
 $Id$
 """
 from pprint import PrettyPrinter
+import os
+import sys
 import unittest
 import doctest
+import subprocess
 
 import zope.component.testing
 from zope.component.interfaces import IFactory
@@ -62,8 +65,67 @@ def rootLocation(obj, name):
     return LocationProxy(obj, Root(), name)
 
 
+IMPORT_SCRIPT = """\
+import sys, time
+started = time.time()
+for name in %(modules)r:
+    __import__(name)
+print time.time() - started
+print ' '.join([name for name in %(expensive)r if name in sys.modules])
+"""
+
+class ImportTimeTests(unittest.TestCase):
+    """The documentation must be cheap to import, even in a new process."""
+
+    # The modules that are imported when the documentation is configured.
+    modules = ['zope.app.apidoc.apidoc',
+               'zope.app.apidoc.utilities',
+               'zope.app.apidoc.component',
+               'zope.app.apidoc.presentation',
+               'zope.app.apidoc.static']
+
+    # Modules that are expensive to import, so they are imported on first
+    # use only.
+    expensive = ['mechanize',
+                 'zope.testbrowser',
+                 'zope.app.testing.functional',
+                 'zope.app.publisher.browser.icon',
+                 'zope.publisher.browser']
+
+    # The time budget for importing the modules in seconds. It is generous,
+    # since it only has to catch imports that are expensive by far.
+    budget = 10.0
+
+    def importModules(self):
+        """Import the modules in a new process.
+
+        The time the imports took and the expensive modules that were
+        imported are returned.
+        """
+        script = IMPORT_SCRIPT % {'modules': self.modules,
+                                  'expensive': self.expensive}
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        process = subprocess.Popen([sys.executable, '-c', script], env=env,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+        stdout, stderr = process.communicate()
+        self.assertEqual(process.returncode, 0, stderr)
+        duration, imported = (stdout.splitlines() + [''])[:2]
+        return float(duration), imported.split()
+
+    def testExpensiveModulesNotImported(self):
+        duration, imported = self.importModules()
+        self.assertEqual(imported, [])
+
+    def testImportTime(self):
+        duration, imported = self.importModules()
+        self.assert_(duration < self.budget,
+                     'Importing took %.1f seconds' % duration)
+
+
 def test_suite():
     return unittest.TestSuite((
+        unittest.makeSuite(ImportTimeTests),
         doctest.DocTestSuite('zope.app.apidoc.browser.apidoc',
                              setUp=setUp, tearDown=placelesssetup.tearDown),
         doctest.DocFileSuite('README.txt',
@@ -72,6 +134,37 @@ def test_suite():
                              optionflags=doctest.NORMALIZE_WHITESPACE),
         doctest.DocFileSuite('classregistry.txt',
                              optionflags=doctest.NORMALIZE_WHITESPACE),
+        doctest.DocFileSuite('cache.txt',
+                             optionflags=doctest.NORMALIZE_WHITESPACE),
+        doctest.DocFileSuite('benchmark.txt',
+                             optionflags=doctest.NORMALIZE_WHITESPACE),
+        doctest.DocFileSuite('static.txt',
+                             optionflags=doctest.NORMALIZE_WHITESPACE),
+        doctest.DocFileSuite('timing.txt',
+                             optionflags=doctest.NORMALIZE_WHITESPACE),
+        doctest.DocFileSuite('metrics.txt',
+                             setUp=zope.component.testing.setUp,
+                             tearDown=zope.component.testing.tearDown,
+                             optionflags=doctest.NORMALIZE_WHITESPACE),
+        doctest.DocFileSuite('memory.txt',
+                             setUp=zope.component.testing.setUp,
+                             tearDown=zope.component.testing.tearDown,
+                             optionflags=doctest.NORMALIZE_WHITESPACE),
+        doctest.DocFileSuite('export.txt',
+                             setUp=setUp,
+                             tearDown=placelesssetup.tearDown,
+                             optionflags=doctest.NORMALIZE_WHITESPACE|
+                                         doctest.ELLIPSIS),
+        doctest.DocFileSuite('importprofile.txt',
+                             setUp=zope.component.testing.setUp,
+                             tearDown=zope.component.testing.tearDown,
+                             optionflags=doctest.NORMALIZE_WHITESPACE|
+                                         doctest.ELLIPSIS),
+        doctest.DocFileSuite('probe.txt',
+                             setUp=zope.component.testing.setUp,
+                             tearDown=zope.component.testing.tearDown,
+                             optionflags=doctest.NORMALIZE_WHITESPACE|
+                                         doctest.ELLIPSIS),
         doctest.DocFileSuite('interface.txt',
                              setUp=setUp,
                              tearDown=placelesssetup.tearDown,
@@ -0,0 +1,154 @@
+##############################################################################
+#
+# Copyright (c) 2010 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Timing of the phases of a documentation request
+
+The time of a request is split into phases, like the traversal, the scans of
+the registries, the rendering of texts and the rendering of the templates.
+The timing is only active in the thread of a request that asked for it, so
+that all other requests only pay for a single check.
+
+$Id$
+"""
+__docformat__ = 'restructuredtext'
+import time
+import threading
+
+from zope.component import adapter
+from zope.publisher.interfaces import IStartRequestEvent, IEndRequestEvent
+
+# The phases that are timed.
+TRAVERSAL = 'traversal'
+REGISTRY = 'registry'
+RENDERTEXT = 'renderText'
+TEMPLATE = 'template'
+PHASES = (TRAVERSAL, REGISTRY, RENDERTEXT, TEMPLATE)
+
+# The name of the request header and of the form variable that turn on the
+# timing of a request. If the form variable has the value ``footer``, the
+# timings are also appended to the page.
+HEADER = 'X-APIDoc-Timing'
+FORM_KEY = 'apidoc-timing'
+FOOTER = 'footer'
+
+_local = threading.local()
+
+
+def start():
+    """Start timing the phases in the current thread."""
+    _local.timings = dict([(phase, 0.0) for phase in PHASES])
+    _local.started = time.time()
+    # The entered phases as ``[phase, start, time of nested phases]``.
+    _local.stack = []
+
+
+def stop():
+    """Stop timing and return the timings, see `getTimings()`."""
+    timings = getTimings()
+    _local.__dict__.clear()
+    return timings
+
+
+def isActive():
+    """Check whether the phases are timed in the current thread."""
+    return getattr(_local, 'stack', None) is not None
+
+
+def getTimings():
+    """Return the time spent in every phase so far in seconds.
+
+    The time of nested phases is only counted for the inner phase, so that
+    the phases add up to at most the ``total`` time. `None` is returned, if
+    the timing is not active.
+    """
+    if not isActive():
+        return None
+    timings = dict(_local.timings)
+    timings['total'] = time.time() - _local.started
+    return timings
+
+
+def enter(phase):
+    """Enter a phase, if the timing is active."""
+    stack = getattr(_local, 'stack', None)
+    if stack is not None:
+        stack.append([phase, time.time(), 0.0])
+
+
+def leave(phase):
+    """Leave the innermost phase, if it is the given one."""
+    stack = getattr(_local, 'stack', None)
+    if not stack or stack[-1][0] != phase:
+        return
+    name, started, nested = stack.pop()
+    elapsed = time.time() - started
+    _local.timings[name] += elapsed - nested
+    if stack:
+        stack[-1][2] += elapsed
+
+
+def measure(phase, func, *args, **kw):
+    """Call a function and count its time for a phase."""
+    if not isActive():
+        return func(*args, **kw)
+    enter(phase)
+    try:
+        return func(*args, **kw)
+    finally:
+        leave(phase)
+
+
+def timed(phase):
+    """Decorator of functions whose time is counted for a phase."""
+    def decorator(func):
+        def wrapper(*args, **kw):
+            return measure(phase, func, *args, **kw)
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+    return decorator
+
+
+def formatTimings(timings):
+    """Format the timings in milliseconds for a response header."""
+    return '; '.join(['%s=%.1fms' % (phase, timings[phase]*1000)
+                      for phase in PHASES + ('total',)])
+
+
+def isRequested(request):
+    """Check whether a request asked for the timing of its phases."""
+    return bool(request.getHeader(HEADER) or request.form.get(FORM_KEY))
+
+
+@adapter(IStartRequestEvent)
+def startRequest(event):
+    """Start timing a request that asked for it.
+
+    The traversal phase lasts until a timed view is called.
+    """
+    if isRequested(event.request):
+        start()
+        enter(TRAVERSAL)
+
+
+@adapter(IEndRequestEvent)
+def endRequest(event):
+    """Make sure that the timing does not leak into the next request."""
+    _local.__dict__.clear()
+
+
+def cleanUp():
+    _local.__dict__.clear()
+
+from zope.testing.cleanup import addCleanUp
+addCleanUp(cleanUp)
@@ -21,9 +21,10 @@ from type import TypeInterface
 from zope.security.proxy import isinstance, removeSecurityProxy
 from zope.traversing.api import getName
 from zope.app.apidoc.browser.utilities import findAPIDocumentationRootURL
+from zope.app.apidoc.browser.timing import TimedView
 
 
-class Menu(object):
+class Menu(TimedView):
     """Menu View Helper Class"""
 
     def getMenuTitle(self, node):
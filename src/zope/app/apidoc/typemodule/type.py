@@ -18,14 +18,163 @@ $Id$
 __docformat__ = 'restructuredtext'
 
 from zope.interface import implements
-from zope.component import queryUtility, getUtilitiesFor
+from zope.component import adapter, queryUtility, getSiteManager
+from zope.component.interfaces import IRegistered, IRegistrationEvent
+from zope.component.registry import UtilityRegistration
 from zope.i18nmessageid import ZopeMessageFactory as _
 from zope.interface.interfaces import IInterface
 from zope.location import LocationProxy
 from zope.location.interfaces import ILocation
 
+from zope.app.apidoc.cache import BoundedCache, registerCache
+from zope.app.apidoc.generation import INTERFACES, getGeneration
 from zope.app.apidoc.interfaces import IDocumentationModule
 from zope.app.apidoc.utilities import ReadContainerBase
+from zope.app.apidoc.utilitymodule.utilitymodule import getSiteManagerChain
+
+
+def _sortKey(item):
+    name, obj = item
+    getName = getattr(obj, 'getName', None)
+    if getName is None:
+        return (name, name)
+    return (getName(), name)
+
+
+class TypeIndex(object):
+    """An index of the interface types of a site manager and the interfaces
+    providing them.
+
+    The index is built lazily and then kept up-to-date by the registration
+    events of interface utilities, so that listings do not have to scan the
+    site manager on every request. Until the handler of those events is seen
+    to be registered, the index is built again whenever the generation of
+    the interfaces changes.
+    """
+
+    def __init__(self, sm):
+        self.sm = sm
+        self.clear()
+
+    def _validate(self):
+        if self._tracked:
+            return
+        generation = getGeneration(INTERFACES)
+        if generation != self._generation:
+            self.clear()
+            self._generation = generation
+
+    def clear(self):
+        self._generation = None
+        # Whether the index is updated by `utilityRegistrationChanged()`
+        self._tracked = False
+        # name -> interface type
+        self._types = None
+        # interface type -> {name: member}
+        self._members = {}
+        # Sorted versions of the above
+        self._sortedTypes = None
+        self._sortedMembers = {}
+
+    def getTypes(self):
+        """Return a sorted list of ``(name, type)`` pairs."""
+        self._validate()
+        if self._sortedTypes is None:
+            if self._types is None:
+                self._types = dict(
+                    [(name, iface)
+                     for name, iface in self.sm.getUtilitiesFor(IInterface)
+                     if iface.extends(IInterface)])
+            types = self._types.items()
+            types.sort(key=_sortKey)
+            self._sortedTypes = types
+        return self._sortedTypes
+
+    def getMembers(self, type):
+        """Return a sorted list of ``(name, member)`` pairs of a type."""
+        self._validate()
+        members = self._sortedMembers.get(type)
+        if members is None:
+            if type not in self._members:
+                self._members[type] = dict(self.sm.getUtilitiesFor(type))
+            members = self._members[type].items()
+            members.sort(key=_sortKey)
+            self._sortedMembers[type] = members
+        return members
+
+    def getStatistics(self):
+        """Return the number of indexed types and members."""
+        self._validate()
+        return {'types': len(self._types or ()),
+                'members': sum([len(members)
+                                for members in self._members.values()])}
+
+    def _update(self, mapping, name, component, added):
+        if added:
+            mapping[name] = component
+        elif mapping.get(name) is component:
+            del mapping[name]
+
+    def update(self, reg, added):
+        """Update the index for an added or removed utility registration."""
+        self._validate()
+        self._tracked = True
+        provided = reg.provided
+        component = reg.component
+        if self._types is not None and provided.isOrExtends(IInterface) and \
+               IInterface.providedBy(component) and \
+               component.extends(IInterface):
+            self._update(self._types, reg.name, component, added)
+            self._sortedTypes = None
+        for type, members in self._members.items():
+            if provided.isOrExtends(type):
+                self._update(members, reg.name, component, added)
+                self._sortedMembers.pop(type, None)
+
+
+# The type indexes, keyed by the site manager they were built for
+_indexes = registerCache('typemodule.indexes', BoundedCache(100))
+
+def getTypeIndex(context=None):
+    """Return the type index of the site manager of the context."""
+    sm = getSiteManager(context)
+    index = _indexes.get(sm)
+    if index is None:
+        index = TypeIndex(sm)
+        _indexes.set(sm, index)
+    return index
+
+
+def getStatistics():
+    """Return the number of indexed types and members of all indexes."""
+    statistics = {'types': 0, 'members': 0}
+    for index in _indexes.values():
+        for key, value in index.getStatistics().items():
+            statistics[key] += value
+    return statistics
+
+
+@adapter(IRegistrationEvent)
+def utilityRegistrationChanged(event):
+    """Keep the type indexes up-to-date with interface registrations."""
+    reg = event.object
+    if not isinstance(reg, UtilityRegistration):
+        return
+    for sm, index in _indexes.items():
+        if sm is reg.registry and not sm.__bases__:
+            index.update(reg, IRegistered.providedBy(event))
+        elif reg.registry in getSiteManagerChain(sm):
+            # The registration may override or uncover registrations of
+            # other site managers in the chain, so the index is built again.
+            _indexes.invalidate(sm)
+
+
+def _clear():
+    _indexes.clear()
+
+from zope.testing.cleanup import addCleanUp
+addCleanUp(_clear)
+
 
 class TypeInterface(ReadContainerBase):
     """Representation of the special type interface.
@@ -67,10 +216,8 @@ class TypeInterface(ReadContainerBase):
 
     def items(self):
         """See zope.container.interfaces.IReadContainer"""
-        results = [(name, LocationProxy(iface, self, name))
-                   for name, iface in getUtilitiesFor(self.interface)]
-        results.sort(lambda x, y: cmp(x[1].getName(), y[1].getName()))
-        return results
+        return [(name, LocationProxy(iface, self, name))
+                for name, iface in getTypeIndex().getMembers(self.interface)]
 
 
 class TypeModule(ReadContainerBase):
@@ -92,6 +239,63 @@ class TypeModule(ReadContainerBase):
 
       >>> [type.interface for name, type in module.items()]
       [<InterfaceClass zope.app.apidoc.typemodule.type.IFoo>]
+
+    The listings are served from the type index of the site manager, which
+    is updated by the registration events of interfaces; the handler is
+    usually registered via ZCML:
+
+      >>> import zope.component
+      >>> zope.component.provideHandler(utilityRegistrationChanged)
+
+      >>> from zope.interface import Interface
+      >>> class IBar(Interface):
+      ...    pass
+      >>> from zope.component.interface import provideInterface
+      >>> provideInterface('IBar', IBar, IFoo)
+
+      >>> [name for name, iface in module.get('IFoo').items()]
+      [u'IBar']
+
+      >>> class IBaz(IInterface):
+      ...    pass
+      >>> ztapi.provideUtility(IInterface, IBaz, 'IBaz')
+      >>> [type.interface for name, type in module.items()]
+      [<InterfaceClass zope.app.apidoc.typemodule.type.IBaz>,
+       <InterfaceClass zope.app.apidoc.typemodule.type.IFoo>]
+
+    Every site manager has its own index, so that the types registered in a
+    local site manager do not show up elsewhere:
+
+      >>> from zope.component.registry import Components
+      >>> local = Components('local', (zope.component.getGlobalSiteManager(),))
+      >>> class IQux(IInterface):
+      ...    pass
+      >>> local.registerUtility(IQux, IInterface, 'IQux')
+
+      >>> def getTypeNames(context=None):
+      ...     return [iface.getName()
+      ...             for name, iface in getTypeIndex(context).getTypes()]
+      >>> getTypeNames(local)
+      ['IBaz', 'IFoo', 'IQux']
+      >>> getTypeNames()
+      ['IBaz', 'IFoo']
+
+    The index of the local site manager is built again, when a type is
+    registered in its chain of site managers:
+
+      >>> class IQuux(IInterface):
+      ...    pass
+      >>> local.registerUtility(IQuux, IInterface, 'IQuux')
+      >>> getTypeNames(local)
+      ['IBaz', 'IFoo', 'IQuux', 'IQux']
+      >>> getTypeNames()
+      ['IBaz', 'IFoo']
+
+      >>> class IQuuux(IInterface):
+      ...    pass
+      >>> ztapi.provideUtility(IInterface, IQuuux, 'IQuuux')
+      >>> getTypeNames(local)
+      ['IBaz', 'IFoo', 'IQuuux', 'IQuux', 'IQux']
     """
 
     implements(IDocumentationModule)
@@ -112,9 +316,5 @@ class TypeModule(ReadContainerBase):
             queryUtility(IInterface, key, default=default), self, key)
 
     def items(self):
-        results = [(name, TypeInterface(iface, self, name))
-                   for name, iface in getUtilitiesFor(IInterface)
-                   if iface.extends(IInterface)]
-        results.sort(lambda x, y: cmp(x[1].interface.getName(),
-                                      y[1].interface.getName()))
-        return results
+        return [(name, TypeInterface(iface, self, name))
+                for name, iface in getTypeIndex().getTypes()]
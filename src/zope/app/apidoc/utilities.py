@@ -22,11 +22,11 @@ import sys
 import types
 import inspect
 from os.path import dirname
+from repr import Repr
 
 from zope.component import createObject, getMultiAdapter
 from zope.interface import implements, implementedBy
-from zope.publisher.browser import TestRequest
-from zope.security.checker import getCheckerForInstancesOf, Global
+from zope.security.checker import getCheckerForInstancesOf, Checker, Global
 from zope.security.interfaces import INameBasedChecker
 from zope.security.proxy import isinstance, removeSecurityProxy
 
@@ -34,7 +34,11 @@ import zope.app
 import zope.i18nmessageid
 from zope.container.interfaces import IReadContainer
 
-from zope.app.apidoc.classregistry import safe_import, IGNORE_MODULES
+from zope.app.apidoc import classregistry
+from zope.app.apidoc import timing
+from zope.app.apidoc.generation import CHECKERS, getGeneration
+from zope.app.apidoc.cache import BoundedCache, registerCache
+from zope.app.apidoc.classregistry import safe_import
 
 _ = zope.i18nmessageid.MessageFactory("zope")
 
@@ -51,12 +55,120 @@ def relativizePath(path):
     return path.replace(BASEDIR, 'Zope3')
 
 
+def _compilePrefixes(prefixes):
+    """Compile a list of prefixes into a single regular expression.
+
+    Alternatives are tried from left to right, so the first matching prefix
+    of the list wins. ``None`` is returned for an empty list.
+    """
+    if not prefixes:
+        return None
+    return re.compile('|'.join([re.escape(prefix) for prefix in prefixes]))
+
+
+class PathResolver(object):
+    """Memoizes the resolution of Python and file system paths.
+
+    The results depend on `IGNORE_MODULES` of the class registry, `sys.path`
+    and `sys.modules`, so the caches are validated against those on every
+    lookup.
+    """
+
+    def __init__(self, maxsize=10000):
+        # module name -> module
+        self.modules = BoundedCache(maxsize)
+        # module names that could not be imported
+        self.missing = BoundedCache(maxsize)
+        # file path -> file path without the system path prefix
+        self.syspaths = BoundedCache(maxsize)
+        self._ignore = None
+        self._ignoreMatcher = None
+        self._importState = None
+        self._sysPath = None
+        self._sysPathMatcher = None
+
+    def _validateModules(self):
+        if classregistry.IGNORE_MODULES != self._ignore:
+            self._ignore = list(classregistry.IGNORE_MODULES)
+            self._ignoreMatcher = _compilePrefixes(self._ignore)
+            self.modules.clear()
+            self.missing.clear()
+        # Modules that could not be found before might be available now.
+        state = (classregistry.__import_unknown_modules__, len(sys.modules))
+        if state != self._importState:
+            self._importState = state
+            self.missing.clear()
+
+    def _validateSysPath(self):
+        if sys.path != self._sysPath:
+            self._sysPath = list(sys.path)
+            self._sysPathMatcher = _compilePrefixes(self._sysPath)
+            self.syspaths.clear()
+
+    def isIgnored(self, path):
+        """Return whether the path starts with one of the ignored modules."""
+        self._validateModules()
+        return self._ignoreMatcher is not None and \
+               self._ignoreMatcher.match(path) is not None
+
+    def importModule(self, name):
+        """Import a module like `safe_import()`, but remember the result."""
+        self._validateModules()
+        module = self.modules.get(name)
+        # A module might have been removed from or replaced in `sys.modules`.
+        if module is not None and sys.modules.get(name) is module:
+            return module
+        if name in self.missing:
+            return None
+        module = safe_import(name)
+        if module is None:
+            self.missing.set(name, True)
+        else:
+            self.modules.set(name, module)
+        return module
+
+    def truncateSysPath(self, path):
+        """Remove the system path prefix from the path."""
+        self._validateSysPath()
+        result = self.syspaths.get(path)
+        if result is None:
+            match = self._sysPathMatcher is not None and \
+                    self._sysPathMatcher.match(path)
+            if match:
+                result = path.replace(match.group(), '')[1:]
+            else:
+                result = path
+            self.syspaths.set(path, result)
+        return result
+
+    def getStatistics(self):
+        """Return the usage statistics of the caches."""
+        return {'modules': self.modules.getStatistics(),
+                'missing': self.missing.getStatistics(),
+                'syspaths': self.syspaths.getStatistics()}
+
+    def clear(self):
+        self.modules.clear()
+        self.missing.clear()
+        self.syspaths.clear()
+
+
+pathResolver = PathResolver()
+registerCache('utilities.modules', pathResolver.modules)
+registerCache('utilities.missingModules', pathResolver.missing)
+registerCache('utilities.syspaths', pathResolver.syspaths)
+
+def getPathCacheStatistics():
+    """Return the usage statistics of the path resolution caches."""
+    return pathResolver.getStatistics()
+
+from zope.testing.cleanup import addCleanUp
+addCleanUp(pathResolver.clear)
+
+
 def truncateSysPath(path):
     """Remove the system path prefix from the path."""
-    for syspath in sys.path:
-        if path.startswith(syspath):
-            return path.replace(syspath, '')[1:]
-    return path
+    return pathResolver.truncateSysPath(path)
 
 
 class ReadContainerBase(object):
@@ -121,9 +233,8 @@ def isReferencable(path):
 
     # There are certain paths that we do not want to reference, most often
     # because they are outside the scope of this documentation
-    for exclude_name in IGNORE_MODULES:
-        if path.startswith(exclude_name):
-            return False
+    if pathResolver.isIgnored(path):
+        return False
     split_path = path.rsplit('.', 1)
     if len(split_path) == 2:
         module_name, obj_name = split_path
@@ -135,7 +246,7 @@ def isReferencable(path):
         obj_name.startswith('_') and
         not (obj_name.startswith('__') and obj_name.endswith('__'))):
         return False
-    module = safe_import(module_name)
+    module = pathResolver.importModule(module_name)
     if module is None:
         return False
 
@@ -161,30 +272,154 @@ def _evalId(id):
     return id
 
 
-def getPermissionIds(name, checker=_marker, klass=_marker):
-    """Get the permissions of an attribute."""
+class PermissionTable(object):
+    """The read and write permissions of all attributes of a checker.
+
+    For regular name-based checkers the permission mappings are evaluated in
+    one pass; for other checkers the permissions are looked up and remembered
+    name by name. The table is current as long as the mappings of the checker
+    are the same objects of the same size and the generation of the checkers
+    did not change.
+    """
+
+    def __init__(self, checker):
+        self.checker = checker
+        self.nameBased = (checker is not None and
+                          INameBasedChecker.providedBy(checker))
+        # Subclasses of `Checker` may compute the permissions differently,
+        # so only the mappings of plain checkers are enumerated.
+        self.enumerable = self.nameBased and type(checker) is Checker
+        self.read = {}
+        self.write = {}
+        if self.enumerable:
+            for name, perm in checker.get_permissions.items():
+                self.read[name] = _evalId(perm)
+            for name, perm in checker.set_permissions.items():
+                self.write[name] = _evalId(perm)
+        self._state = self._getState()
+
+    def _getState(self):
+        # The mappings, which are compared by identity, and a token that is
+        # cheap to compare, instead of a copy of the mappings
+        if not self.enumerable:
+            return None
+        getPerms = self.checker.get_permissions
+        setPerms = self.checker.set_permissions
+        return (getPerms, setPerms,
+                (len(getPerms), len(setPerms), getGeneration(CHECKERS)))
+
+    def isCurrent(self):
+        """Return whether the checker changed since the table was built."""
+        if self._state is None:
+            return True
+        getPerms, setPerms, token = self._getState()
+        return (getPerms is self._state[0] and setPerms is self._state[1] and
+                token == self._state[2])
+
+    def getPermissionIds(self, name):
+        """Get the permissions of an attribute."""
+        if not self.nameBased:
+            return {'read_perm': None, 'write_perm': None}
+        if not self.enumerable and name not in self.read:
+            self.read[name] = _evalId(self.checker.permission_id(name))
+            self.write[name] = _evalId(
+                self.checker.setattr_permission_id(name))
+        return {'read_perm': self.read.get(name) or _('n/a'),
+                'write_perm': self.write.get(name) or _('n/a')}
+
+
+# Permission tables, keyed by the id of the checker
+_permissionTables = registerCache('utilities.permissionTables',
+                                  BoundedCache(1000))
+
+def getPermissionTable(checker=_marker, klass=_marker):
+    """Get the permission table of a checker or the checker of a class."""
     assert (klass is _marker) != (checker is _marker)
-    entry = {}
 
     if klass is not _marker:
         checker = getCheckerForInstancesOf(klass)
 
-    if checker is not None and INameBasedChecker.providedBy(checker):
-        entry['read_perm'] = _evalId(checker.permission_id(name)) \
-                             or _('n/a')
-        entry['write_perm'] = _evalId(checker.setattr_permission_id(name)) \
-                              or _('n/a')
-    else:
-        entry['read_perm'] = entry['write_perm'] = None
+    table = _permissionTables.get(id(checker))
+    # The table keeps a reference to its checker, so the id cannot be reused
+    # as long as the table is in the cache; but the checker might have
+    # changed since.
+    if table is None or table.checker is not checker or not table.isCurrent():
+        table = PermissionTable(checker)
+        _permissionTables.set(id(checker), table)
+    return table
+
+addCleanUp(_permissionTables.clear)
+
 
-    return entry
+def getPermissionIds(name, checker=_marker, klass=_marker):
+    """Get the permissions of an attribute."""
+    return getPermissionTable(checker, klass).getPermissionIds(name)
 
 
+# Default values that are larger than those limits are abbreviated in
+# function signatures, so that huge values do not blow up the pages.
+MAX_DEFAULT_ITEMS = 20
+MAX_DEFAULT_LENGTH = 80
+
+class _DefaultRepr(Repr):
+    """Abbreviated representations of default values.
+
+    Unlike with `Repr`, the representations of all other objects are limited
+    by `maxother`, since they may be arbitrarily long as well.
+    """
+
+    def repr_instance(self, x, level):
+        try:
+            s = repr(x)
+        except Exception:
+            return '<%s instance at %x>' % (x.__class__.__name__, id(x))
+        if len(s) > self.maxother:
+            i = max(0, (self.maxother-3)//2)
+            j = max(0, self.maxother-3-i)
+            s = s[:i] + '...' + s[len(s)-j:]
+        return s
+
+_defaultRepr = _DefaultRepr()
+_defaultRepr.maxlevel = 3
+_defaultRepr.maxstring = _defaultRepr.maxother = MAX_DEFAULT_LENGTH
+_defaultRepr.maxlong = MAX_DEFAULT_LENGTH
+_defaultRepr.maxtuple = _defaultRepr.maxlist = _defaultRepr.maxdict = \
+    _defaultRepr.maxset = _defaultRepr.maxfrozenset = MAX_DEFAULT_ITEMS
+
+def _reprDefault(value):
+    """Return the representation of a default value in a signature.
+
+    Large values are abbreviated, also if they are nested in other values.
+    """
+    return _defaultRepr.repr(value)
+
+
+# Signatures, keyed by the code object, the identity of the defaults and
+# whether the function is a method.
+_signatures = registerCache('utilities.signatures', BoundedCache(10000))
+
 def getFunctionSignature(func):
     """Return the signature of a function or method."""
     if not isinstance(func, (types.FunctionType, types.MethodType)):
         raise TypeError("func must be a function or method")
 
+    isMethod = type(func) == types.MethodType
+    function = isMethod and func.im_func or func
+    defaults = function.func_defaults
+    key = (function.func_code, id(defaults), isMethod)
+    cached = _signatures.get(key)
+    # The cache entry keeps a reference to the defaults, so that their id
+    # cannot be reused by another object.
+    if cached is not None and cached[0] is defaults:
+        return cached[1]
+    sig = _formatSignature(func)
+    _signatures.set(key, (defaults, sig))
+    return sig
+
+addCleanUp(_signatures.clear)
+
+
+def _formatSignature(func):
     args, varargs, varkw, defaults = inspect.getargspec(func)
     placeholder = object()
     sig = '('
@@ -212,7 +447,7 @@ def getFunctionSignature(func):
         if default is placeholder:
             str_args.append(name)
         else:
-            str_args.append(name + '=' + repr(default))
+            str_args.append(name + '=' + _reprDefault(default))
 
     if varargs:
         str_args.append('*'+varargs)
@@ -310,6 +545,7 @@ def dedentString(text):
     return re.compile('\n {%i}' % dedent, re.M).sub('\n', text)
 
 
+@timing.timed(timing.RENDERTEXT)
 def renderText(text, module=None, format=None, dedent=True):
     if not text:
         return u''
@@ -331,5 +567,7 @@ def renderText(text, module=None, format=None, dedent=True):
         text = text.decode('latin-1', 'replace')
     source = createObject(format, text)
 
+    # Imported here, since the browser publisher is expensive to import.
+    from zope.publisher.browser import TestRequest
     renderer = getMultiAdapter((source, TestRequest()))
     return renderer.render()
@@ -27,8 +27,10 @@ from zope.app.apidoc.utilities import getPythonPath
 from zope.app.apidoc.utilitymodule.utilitymodule import NONAME, Utility
 from zope.app.apidoc.utilitymodule.utilitymodule import UtilityInterface
 from zope.app.apidoc.browser.utilities import findAPIDocumentationRootURL
+from zope.app.apidoc.browser.conditional import ConditionalView
+from zope.app.apidoc.browser.timing import TimedView
 
-class UtilityDetails(object):
+class UtilityDetails(TimedView, ConditionalView):
     """Utility Details View."""
 
     def getAPIDocRootURL(self):
@@ -57,7 +59,7 @@ class UtilityDetails(object):
         return {'path': result['path'], 'url': result['url']}
 
 
-class Menu(object):
+class Menu(TimedView):
     """Menu View Helper Class"""
 
     def getMenuTitle(self, node):
@@ -20,17 +20,22 @@ __docformat__ = 'restructuredtext'
 import base64, binascii
 
 import zope.component
-from zope.component.registry import UtilityRegistration
 from zope.interface import implements
 from zope.location.interfaces import ILocation
 
 from zope.i18nmessageid import ZopeMessageFactory as _
+from zope.app.apidoc.cache import GenerationalCache, registerCache
+from zope.app.apidoc.generation import getGeneration
 from zope.app.apidoc.interfaces import IDocumentationModule
 from zope.app.apidoc.utilities import ReadContainerBase, getPythonPath
 
 # Constant used when the utility has no name
 NONAME = '__noname__'
 
+# Cache of the utility interface catalogs; it maps the chain of site managers
+# to the list of ``(path, interface)`` pairs, sorted by the interface name.
+_catalogs = registerCache('utilitymodule.catalogs', GenerationalCache(100))
+
 def encodeName(name):
     return base64.urlsafe_b64encode(name.encode('utf-8'))
 
@@ -119,26 +124,65 @@ class UtilityModule(ReadContainerBase):
             return UtilityInterface(self, key, getattr(mod, parts[-1], default))
 
     def items(self):
-        # Use a list of site managers, since we want to support multiple bases
-        smlist = [zope.component.getSiteManager()]
-        seen = []
-        ifaces = {}
-        while smlist:
-            # Get the next site manager
-            sm = smlist.pop()
-            # If we have already looked at this site manager, then skip it
-            if sm in seen:
-                continue
-            # Add the current site manager to the list of seen ones
-            seen.append(sm)
-            # Add the bases of the current site manager to the list of site
-            # managers to be processed
-            smlist += list(sm.__bases__)
-            for reg in sm.registeredUtilities():
-                path = getPythonPath(reg.provided)
-                ifaces[path] = UtilityInterface(self, path, reg.provided)
-
-        items = ifaces.items()
-        items.sort(lambda x, y: cmp(x[0].split('.')[-1], y[0].split('.')[-1]))
-        return items
+        catalog = getUtilityInterfaceCatalog(zope.component.getSiteManager())
+        return [(path, UtilityInterface(self, path, iface))
+                for path, iface in catalog]
+
 
+def getSiteManagerChain(sm):
+    """Return all site managers that are looked at for the given one.
+
+    The site managers are returned in the order they are searched, including
+    all the bases; every site manager is only listed once.
+    """
+    # Use a list of site managers, since we want to support multiple bases
+    smlist = [sm]
+    seen = {}
+    chain = []
+    while smlist:
+        # Get the next site manager
+        sm = smlist.pop()
+        # If we have already looked at this site manager, then skip it
+        if id(sm) in seen:
+            continue
+        # Add the current site manager to the list of seen ones
+        seen[id(sm)] = True
+        chain.append(sm)
+        # Add the bases of the current site manager to the list of site
+        # managers to be processed
+        smlist += list(sm.__bases__)
+    return tuple(chain)
+
+
+def getUtilityInterfaceCatalog(sm):
+    """Return the sorted list of interfaces provided by utilities.
+
+    The result is a list of ``(path, interface)`` pairs, sorted by the short
+    name of the interface. It is computed once per chain of site managers and
+    then served from a cache, until the generation of the components changes.
+    """
+    chain = getSiteManagerChain(sm)
+    catalog = _catalogs.get(chain)
+    if catalog is not None:
+        return catalog
+
+    generation = getGeneration()
+    ifaces = {}
+    for sm in chain:
+        for reg in sm.registeredUtilities():
+            path = getPythonPath(reg.provided)
+            ifaces[path] = reg.provided
+
+    catalog = [(path.split('.')[-1], path, iface)
+               for path, iface in ifaces.items()]
+    catalog.sort()
+    catalog = [(path, iface) for name, path, iface in catalog]
+    _catalogs.set(chain, catalog, generation)
+    return catalog
+
+
+def _clear():
+    _catalogs.clear()
+
+from zope.testing.cleanup import addCleanUp
+addCleanUp(_clear)
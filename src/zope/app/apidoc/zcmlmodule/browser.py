@@ -28,9 +28,11 @@ from zope.app.apidoc.zcmlmodule import Directive, Namespace
 from zope.app.apidoc.ifacemodule.browser import InterfaceDetails
 from zope.app.apidoc.utilities import getPythonPath, isReferencable
 from zope.app.apidoc.utilities import relativizePath
+from zope.app.apidoc.browser.conditional import ConditionalView
+from zope.app.apidoc.browser.timing import TimedView
 from zope.app.apidoc.browser.utilities import findAPIDocumentationRootURL
 
-class Menu(object):
+class Menu(TimedView):
     """Menu View Helper Class"""
 
     def getMenuTitle(self, node):
@@ -61,7 +63,7 @@ def _getFieldName(field):
     return name
 
 
-class DirectiveDetails(object):
+class DirectiveDetails(TimedView, ConditionalView):
     """View class for a Directive."""
 
     def getAPIDocRootURL(self):